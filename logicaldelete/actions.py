@@ -1,12 +1,40 @@
 from django.contrib import messages
 from django.contrib.admin import helpers
 from django.contrib.admin.utils import get_deleted_objects, model_ngettext
+from django.contrib.auth import get_permission_codename
 from django.core.exceptions import PermissionDenied
 from django.db import router
 from django.template.response import TemplateResponse
 from django.utils.encoding import force_text
+from django.utils.text import capfirst
 from django.utils.translation import ugettext as _, ugettext_lazy
 
+from logicaldelete.deletion import get_cascade_counts
+
+
+def get_summary_objects(queryset, user, admin_site, only_deleted=False):
+    """
+    Summary variant of `django.contrib.admin.utils.get_deleted_objects` for
+    large selections. Objects are only counted, so ``deletable_objects`` is
+    empty and ``protected`` lists the number of protected objects per model.
+    """
+    counts, protected_querysets = get_cascade_counts(queryset, only_deleted=only_deleted)
+    perms_needed = set()
+    model_count = {}
+
+    for model, count in counts.items():
+        opts = model._meta
+        model_count[opts.verbose_name_plural] = count
+        if model in admin_site._registry:
+            if not user.has_perm('%s.%s' % (opts.app_label, get_permission_codename('delete', opts))):
+                perms_needed.add(opts.verbose_name)
+
+    protected = [
+        '%s: %d' % (capfirst(qs.model._meta.verbose_name_plural), qs.count())
+        for qs in protected_querysets
+    ]
+    return [], model_count, perms_needed, protected
+
 
 def undelete_selected(modeladmin, request, queryset):
     """
@@ -27,21 +55,27 @@ def undelete_selected(modeladmin, request, queryset):
 
     using = router.db_for_write(modeladmin.model)
 
+    n = queryset.count()
+    # Large selections only get the number of objects per model.
+    summary_only = (modeladmin.summary_confirmation_threshold is not None and
+                    n > modeladmin.summary_confirmation_threshold)
+
     # Populate deletable_objects, a data structure of all related objects that
-    # will also be deleted.
-    deletable_objects, model_count, perms_needed, protected = get_deleted_objects(
-        queryset, opts, request.user, modeladmin.admin_site, using)
+    # will also be restored.
+    if summary_only:
+        deletable_objects, model_count, perms_needed, protected = get_summary_objects(
+            queryset.using(using), request.user, modeladmin.admin_site, only_deleted=True)
+    else:
+        deletable_objects, model_count, perms_needed, protected = get_deleted_objects(
+            queryset, opts, request.user, modeladmin.admin_site, using)
 
     # The user has already confirmed the deletion.
     # Do the deletion and return a None to display the change list view again.
     if request.POST.get('post') and not protected:
         if perms_needed:
             raise PermissionDenied
-        n = queryset.count()
         if n:
-            for obj in queryset:
-                obj_display = force_text(obj)
-                modeladmin.log_restore(request, obj, obj_display)
+            modeladmin.log_restores(request, queryset)
             queryset.undelete()
             modeladmin.message_user(request, _("Successfully recovered %(count)d %(items)s.") % {
                 "count": n, "items": model_ngettext(modeladmin.opts, n)
@@ -49,7 +83,7 @@ def undelete_selected(modeladmin, request, queryset):
         # Return None to display the change list page again.
         return None
 
-    if len(queryset) == 1:
+    if n == 1:
         objects_name = force_text(opts.verbose_name)
     else:
         objects_name = force_text(opts.verbose_name_plural)
@@ -66,6 +100,8 @@ def undelete_selected(modeladmin, request, queryset):
         deletable_objects=[deletable_objects],
         model_count=dict(model_count).items(),
         queryset=queryset,
+        summary_only=summary_only,
+        select_across=request.POST.get('select_across') == '1',
         perms_lacking=perms_needed,
         protected=protected,
         opts=opts,
@@ -105,21 +141,27 @@ def delete_complete(modeladmin, request, queryset):
 
     using = router.db_for_write(modeladmin.model)
 
+    n = queryset.count()
+    # Large selections only get the number of objects per model.
+    summary_only = (modeladmin.summary_confirmation_threshold is not None and
+                    n > modeladmin.summary_confirmation_threshold)
+
     # Populate deletable_objects, a data structure of all related objects that
     # will also be deleted.
-    deletable_objects, model_count, perms_needed, protected = get_deleted_objects(
-        queryset, opts, request.user, modeladmin.admin_site, using)
+    if summary_only:
+        deletable_objects, model_count, perms_needed, protected = get_summary_objects(
+            queryset.using(using), request.user, modeladmin.admin_site, only_deleted=False)
+    else:
+        deletable_objects, model_count, perms_needed, protected = get_deleted_objects(
+            queryset, opts, request.user, modeladmin.admin_site, using)
 
     # The user has already confirmed the deletion.
     # Do the deletion and return a None to display the change list view again.
     if request.POST.get('post') and not protected:
         if perms_needed:
             raise PermissionDenied
-        n = queryset.count()
         if n:
-            for obj in queryset:
-                obj_display = force_text(obj)
-                modeladmin.log_deletion_complete(request, obj, obj_display)
+            modeladmin.log_deletions_complete(request, queryset)
             queryset.delete_complete()
             modeladmin.message_user(request, _("Successfully deleted %(count)d %(items)s.") % {
                 "count": n, "items": model_ngettext(modeladmin.opts, n)
@@ -127,7 +169,7 @@ def delete_complete(modeladmin, request, queryset):
         # Return None to display the change list page again.
         return None
 
-    if len(queryset) == 1:
+    if n == 1:
         objects_name = force_text(opts.verbose_name)
     else:
         objects_name = force_text(opts.verbose_name_plural)
@@ -144,6 +186,8 @@ def delete_complete(modeladmin, request, queryset):
         deletable_objects=[deletable_objects],
         model_count=dict(model_count).items(),
         queryset=queryset,
+        summary_only=summary_only,
+        select_across=request.POST.get('select_across') == '1',
         perms_lacking=perms_needed,
         protected=protected,
         opts=opts,
@@ -3,11 +3,13 @@ from django.contrib.admin import helpers
 from django.contrib.admin.filters import SimpleListFilter
 from django.contrib.admin.options import get_content_type_for_model
 from django.contrib.admin.utils import model_ngettext, get_deleted_objects
+from django.contrib.admin.views.main import ChangeList
 from django.core.exceptions import PermissionDenied
 from django.db import router
 from django.http import Http404
 from django.template.response import TemplateResponse
-from django.utils.encoding import force_unicode
+from django.utils import six, timezone
+from django.utils.encoding import force_text
 from django.utils.translation import ugettext_lazy
 from django.utils.translation import ugettext as _
 
@@ -41,6 +43,17 @@ class ActiveListFilter(SimpleListFilter):
         return queryset.filter(date_removed__isnull=True)
 
 
+class LogicalDeleteChangeList(ChangeList):
+    """
+    ChangeList counting the objects with the ``count_strategy`` of the model
+    admin.
+    """
+
+    def get_results(self, request):
+        self.root_queryset = self.model_admin.get_count_queryset(self.root_queryset)
+        return super(LogicalDeleteChangeList, self).get_results(request)
+
+
 class LogicalModelAdmin(admin.ModelAdmin):
     """
     A base model admin to use in providing access to to logically deleted
@@ -49,6 +62,17 @@ class LogicalModelAdmin(admin.ModelAdmin):
     
     delete_selected_complete_confirmation = None
     form = LogicalModelForm
+    # Above this number of selected objects the restore and delete complete
+    # confirmation pages only show the number of related objects per model.
+    # None always lists every related object.
+    summary_confirmation_threshold = 100
+    # How the changelist counts objects on huge tables: None for exact counts,
+    # 'estimate' for PostgreSQL planner estimates (exact below
+    # estimate_exact_below rows) or 'cached' for counts cached
+    # count_cache_timeout seconds or until objects are deleted or restored.
+    count_strategy = None
+    estimate_exact_below = 1000
+    count_cache_timeout = 300
 
     def __init__(self, *args, **kwargs):
         super(LogicalModelAdmin, self).__init__(*args, **kwargs)
@@ -77,6 +101,24 @@ class LogicalModelAdmin(admin.ModelAdmin):
 
         return actions
 
+    def get_changelist(self, request, **kwargs):
+        if self.count_strategy:
+            return LogicalDeleteChangeList
+        return super(LogicalModelAdmin, self).get_changelist(request, **kwargs)
+
+    def get_count_queryset(self, queryset):
+        """
+        Returns ``queryset`` counting with the ``count_strategy`` of the admin.
+        """
+        return queryset.with_count_strategy(
+            self.count_strategy, exact_below=self.estimate_exact_below, timeout=self.count_cache_timeout)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if self.count_strategy:
+            queryset = self.get_count_queryset(queryset)
+        return super(LogicalModelAdmin, self).get_paginator(
+            request, queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page)
+
     def get_queryset(self, request):
         qs = self.model._default_manager.everything()
         ordering = self.get_ordering(request)
@@ -130,4 +172,50 @@ class LogicalModelAdmin(admin.ModelAdmin):
             object_id=object.pk,
             object_repr=object_repr,
             action_flag=LOGICAL_RESTORE,
-        )
\ No newline at end of file
+        )
+
+    def log_actions(self, request, objects, action_flag, log_action):
+        """
+        Bulk variant of `LogEntry.objects.log_action`, creating the entries of
+        every object in ``objects`` with a single query. When a subclass
+        overrides ``log_action``, the name of the per-object method like
+        `log_restore`, it's called for every object instead.
+        """
+        from django.contrib.admin.models import LogEntry
+        method = six.get_unbound_function(getattr(type(self), log_action))
+        if method is not six.get_unbound_function(getattr(LogicalModelAdmin, log_action)):
+            return [getattr(self, log_action)(request, obj, force_text(obj)) for obj in objects]
+
+        content_type_id = get_content_type_for_model(self.model).pk
+        action_time = timezone.now()
+        return LogEntry.objects.bulk_create([
+            LogEntry(
+                action_time=action_time,
+                user_id=request.user.pk,
+                content_type_id=content_type_id,
+                object_id=force_text(obj.pk),
+                object_repr=force_text(obj)[:200],
+                action_flag=action_flag,
+            ) for obj in objects
+        ])
+
+    def log_deletions(self, request, objects):
+        """
+        Log that the objects will be logical deleted, bulk variant of
+        `log_deletion`.
+        """
+        return self.log_actions(request, objects, LOGICAL_DELETION, 'log_deletion')
+
+    def log_deletions_complete(self, request, objects):
+        """
+        Log that the objects will be deleted, bulk variant of
+        `log_deletion_complete`.
+        """
+        from django.contrib.admin.models import DELETION
+        return self.log_actions(request, objects, DELETION, 'log_deletion_complete')
+
+    def log_restores(self, request, objects):
+        """
+        Log that the objects will be restored, bulk variant of `log_restore`.
+        """
+        return self.log_actions(request, objects, LOGICAL_RESTORE, 'log_restore')
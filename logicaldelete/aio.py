@@ -0,0 +1,67 @@
+# coding=utf-8
+"""
+Helpers behind the async API of `LogicalModel` and `LogicalDeleteQuerySet`,
+Python 3.6 or newer only.
+
+This Django version has no async ORM, so every call runs the synchronous
+method in a worker thread: asgiref's thread sensitive ``sync_to_async`` when
+asgiref is installed, otherwise a single thread executor, so the database
+connection of that thread is reused.
+"""
+import asyncio
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db.models.sql.constants import GET_ITERATOR_CHUNK_SIZE
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:
+    sync_to_async = None
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1)
+    return _executor
+
+
+def run_sync(func, *args, **kwargs):
+    """
+    Returns an awaitable running ``func(*args, **kwargs)`` in the worker
+    thread.
+    """
+    if sync_to_async is not None:
+        return sync_to_async(func, thread_sensitive=True)(*args, **kwargs)
+    return asyncio.get_event_loop().run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def aiterate(queryset, chunk_size=GET_ITERATOR_CHUNK_SIZE):
+    """
+    Iterates ``queryset`` with ``async for``, fetching the results in the
+    worker thread ``chunk_size`` at a time with ``iterator()``, so large
+    tables aren't loaded at once. Querysets with prefetch_related() lookups
+    or cached() results are fetched at once, like in sync code.
+    """
+    if queryset._result_cache is None and (queryset._prefetch_related_lookups or
+                                           queryset._cache_timeout is not None):
+        await run_sync(queryset._fetch_all)
+    if queryset._result_cache is not None:
+        for obj in queryset._result_cache:
+            yield obj
+        return
+
+    iterator = queryset.iterator()
+    try:
+        while True:
+            chunk = await run_sync(list, itertools.islice(iterator, chunk_size))
+            if not chunk:
+                break
+            for obj in chunk:
+                yield obj
+    finally:
+        await run_sync(iterator.close)
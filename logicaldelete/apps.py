@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.utils.translation import ugettext_lazy as _
+
+
+class LogicalDeleteConfig(AppConfig):
+    name = 'logicaldelete'
+    verbose_name = _('Logical delete')
+
+    def ready(self):
+        from logicaldelete import checks  # NOQA
@@ -0,0 +1,210 @@
+# coding=utf-8
+import time
+from collections import Counter
+
+from django.db import models, router, transaction
+from django.db.models.fields.related import resolve_relation
+from django.db.models.sql import DeleteQuery
+from django.db.models.sql.datastructures import BaseTable
+from django.utils import six
+
+from logicaldelete.deletion import get_candidate_relations_to_delete, get_cascade_models, get_options
+
+
+def create_archive_model(model):
+    """
+    Returns a model with the concrete fields of ``model`` stored in the
+    ``<db_table>_archive`` table, where ``LogicalDeleteMeta.archive`` moves the
+    logically deleted rows of ``model``.
+
+    Relations of the archive model have neither reverse accessors nor database
+    constraints, and its fields aren't unique, rows are only unique by
+    primary key.
+    """
+    attrs = {'__module__': model.__module__}
+    for field in model._meta.local_concrete_fields:
+        if field.is_relation:
+            # Related models may not be loaded yet, deconstruct() needs them.
+            attrs[field.name] = models.ForeignKey(
+                resolve_relation(model, field.remote_field.model),
+                on_delete=models.DO_NOTHING, related_name='+', db_constraint=False,
+                to_field=field.remote_field.field_name, primary_key=field.primary_key,
+                null=field.null, blank=field.blank, db_column=field.db_column, db_index=field.db_index,
+            )
+            continue
+        name, path, args, kwargs = field.deconstruct()
+        if not field.primary_key:
+            kwargs.pop('unique', None)
+        if name == 'deletion_batch':
+            # Every archived row is deleted, unarchive() looks them up by batch.
+            kwargs['db_index'] = True
+        attrs[name] = field.__class__(*args, **kwargs)
+
+    attrs['Meta'] = type(str('Meta'), (object,), {
+        'app_label': model._meta.app_label,
+        'db_table': '%s_archive' % model._meta.db_table,
+        'managed': model._meta.managed,
+    })
+    return type(str('%sArchive' % model.__name__), (models.Model,), attrs)
+
+
+def archive_queryset(queryset):
+    """
+    Returns a copy of ``queryset`` reading the archive table of its model
+    instead of the live one.
+    """
+    clone = queryset._clone(_with_archive=False)
+    alias = clone.query.get_initial_alias()
+    clone.query.alias_map[alias] = BaseTable(get_options(queryset.model).archive_model._meta.db_table, alias)
+    return clone
+
+
+def union_queryset(queryset):
+    """
+    Returns a copy of ``queryset`` reading both the live and the archive
+    tables of its model, with the ordering and limits of ``queryset``
+    applied to the union.
+
+    select_related() is left out: its inner joins to the live tables drop
+    the rows whose related rows are archived. Related objects are loaded on
+    access instead.
+    """
+    live = queryset._clone(_with_archive=False)
+    archived = archive_queryset(queryset)
+    for qs in (live, archived):
+        qs.query.clear_ordering(force_empty=True)
+        qs.query.clear_limits()
+        qs.query.select_related = False
+
+    combined = live.union(archived, all=True)
+    combined.query.default_ordering = queryset.query.default_ordering
+    combined.query.order_by = queryset.query.order_by
+    combined.query.set_limits(queryset.query.low_mark, queryset.query.high_mark)
+    combined._prefetch_related_lookups = queryset._prefetch_related_lookups
+    return combined
+
+
+def move_rows(queryset, to_model):
+    """
+    Copies the rows of ``queryset`` to ``to_model``, which has the same
+    columns, and deletes them from the table of ``queryset``, without
+    signals nor cascades. Returns the number of moved rows.
+    """
+    fields = queryset.model._meta.concrete_fields
+    attnames = [field.attname for field in fields]
+    rows = list(queryset.select_for_update().values_list(*[field.name for field in fields]))
+    if not rows:
+        return 0
+
+    to_model._base_manager.using(queryset.db).bulk_create([to_model(**dict(zip(attnames, row))) for row in rows])
+    pk_index = fields.index(queryset.model._meta.pk)
+    DeleteQuery(queryset.model).delete_batch([row[pk_index] for row in rows], queryset.db)
+    return len(rows)
+
+
+def get_archive_queryset(model, older_than=None, deletion_batch=None, using=None):
+    """
+    Returns the logically deleted objects of ``model`` that can be archived:
+    deleted before ``older_than`` or in ``deletion_batch`` if given, and not
+    referenced by other rows through a database constraint.
+    """
+    using = using or router.db_for_write(model)
+    queryset = model._base_manager.using(using).filter(date_removed__isnull=False)
+    if older_than is not None:
+        queryset = queryset.filter(date_removed__lt=older_than)
+    if deletion_batch is not None:
+        queryset = queryset.filter(deletion_batch=deletion_batch)
+
+    for related in get_candidate_relations_to_delete(model._meta):
+        field = related.field
+        if not field.db_constraint:
+            continue
+        references = related.related_model._base_manager.using(using).filter(
+            **{'%s__isnull' % field.attname: False}
+        ).values(field.attname)
+        queryset = queryset.exclude(**{'%s__in' % field.target_field.attname: references})
+    return queryset
+
+
+def archive(model, older_than=None, deletion_batch=None, chunk_size=1000, sleep=0, using=None, progress=None):
+    """
+    Moves the logically deleted objects of ``model`` returned by
+    `get_archive_queryset` to its archive table, ``chunk_size`` objects per
+    transaction, sleeping ``sleep`` seconds between chunks. ``progress`` is
+    called with the model and the number of objects moved so far after every
+    chunk. Returns the number of moved objects.
+    """
+    from logicaldelete.query import pk_batches
+
+    archive_model = get_options(model).archive_model
+    queryset = get_archive_queryset(model, older_than=older_than, deletion_batch=deletion_batch, using=using)
+    moved = 0
+
+    for i, pks in enumerate(pk_batches(queryset, chunk_size)):
+        if i and sleep:
+            time.sleep(sleep)
+        with transaction.atomic(using=queryset.db):
+            moved += move_rows(queryset.filter(pk__in=pks), archive_model)
+        if progress is not None:
+            progress(model, moved)
+
+    return moved
+
+
+def archive_all(models=None, **kwargs):
+    """
+    Runs `archive` for ``models``, by default every `LogicalModel` with
+    ``LogicalDeleteMeta.archive``, until nothing else can be moved, children
+    are archived before the parents they reference. Returns the number of
+    moved objects per model label.
+    """
+    from logicaldelete.models import get_logical_models
+
+    if models is None:
+        models = [model for model in get_logical_models() if get_options(model).archive]
+
+    moved = Counter()
+    for _ in range(len(models)):
+        moved_now = Counter({model._meta.label: archive(model, **kwargs) for model in models})
+        moved.update(moved_now)
+        if not any(six.itervalues(moved_now)):
+            break
+    return dict(moved)
+
+
+def unarchive(queryset):
+    """
+    Moves back to the live tables the archived objects of ``queryset`` and the
+    objects archived from the same deletion batches, whether ``queryset``
+    objects are archived or still live, over every model the deletion
+    cascades to, so `undelete()` and `delete_complete()` find them. Returns
+    the number of moved objects.
+    """
+    using = queryset.db
+    models = [model for model in get_cascade_models(queryset.model) if get_options(model).archive_model is not None]
+    if not models:
+        return 0
+
+    pks, batches = [], set(
+        queryset._clone(_with_archive=False).filter(date_removed__isnull=False, deletion_batch__isnull=False)
+        .order_by().values_list('deletion_batch', flat=True).distinct()
+    )
+    if get_options(queryset.model).archive_model is not None:
+        for pk, deletion_batch in archive_queryset(queryset).values_list('pk', 'deletion_batch'):
+            pks.append(pk)
+            if deletion_batch is not None:
+                batches.add(deletion_batch)
+    if not pks and not batches:
+        return 0
+
+    batches = list(batches)
+    moved = 0
+    with transaction.atomic(using=using, savepoint=False):
+        for model in models:
+            archived = get_options(model).archive_model._base_manager.using(using)
+            if model is queryset.model:
+                for i in range(0, len(pks), 1000):
+                    moved += move_rows(archived.filter(pk__in=pks[i:i + 1000]), model)
+            for i in range(0, len(batches), 1000):
+                moved += move_rows(archived.filter(deletion_batch__in=batches[i:i + 1000]), model)
+    return moved
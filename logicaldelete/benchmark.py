@@ -0,0 +1,176 @@
+# coding=utf-8
+"""
+Benchmarks of the delete, undelete and purge operations over synthetic
+model graphs, see the ``logicaldelete_benchmark`` command.
+
+The graph is a chain of ``depth`` models, every one with a CASCADE foreign key
+to the previous, ``fan_out`` children per parent and ``roots`` objects in the
+first model. ``deleted_ratio`` of the objects of every model are logically
+deleted beforehand. The tables are created before every operation and
+dropped after it, so operations don't see each other's changes.
+"""
+import datetime
+import platform
+import random
+import time
+import uuid
+
+import django
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+OPERATIONS = ('delete', 'undelete', 'delete_complete', 'purge', 'cascade_counts')
+
+# Models of the graph per level, shared by every run of the process.
+_models = []
+
+
+def get_models(depth):
+    """
+    Returns the ``depth`` models of the graph, creating the missing ones.
+    """
+    from logicaldelete.models import LogicalModel
+
+    while len(_models) < depth:
+        level = len(_models)
+        attrs = {
+            '__module__': __name__,
+            'Meta': type(str('Meta'), (object,), {
+                'app_label': 'logicaldelete',
+                'db_table': 'logicaldelete_benchmark_%d' % level,
+            }),
+        }
+        if level:
+            attrs['parent'] = models.ForeignKey(_models[-1], on_delete=models.CASCADE)
+        _models.append(type(str('BenchmarkLevel%d' % level), (LogicalModel,), attrs))
+    return _models[:depth]
+
+
+def create_graph(depth, roots, fan_out, deleted_ratio, using, seed=0):
+    """
+    Creates the tables of the graph models and fills the first ``depth``.
+    Returns the number of objects created.
+
+    Models created by earlier runs with a greater depth keep their reverse
+    relations, so every one gets its table.
+    """
+    graph = get_models(depth)
+    rand = random.Random(seed)
+    date_removed = now() - datetime.timedelta(days=1)
+    with connections[using].schema_editor() as editor:
+        for model in _models:
+            editor.create_model(model)
+
+    created, count = 0, roots
+    for level, model in enumerate(graph):
+        objs = []
+        for pk in range(1, count + 1):
+            obj = model(pk=pk)
+            if level:
+                obj.parent_id = (pk - 1) // fan_out + 1
+            if rand.random() < deleted_ratio:
+                obj.date_removed, obj.deletion_batch = date_removed, uuid.uuid4()
+            objs.append(obj)
+        model._base_manager.using(using).bulk_create(objs, batch_size=500)
+        created += count
+        count *= fan_out
+    return created
+
+
+def drop_graph(using):
+    with connections[using].schema_editor() as editor:
+        for model in reversed(_models):
+            editor.delete_model(model)
+
+
+def run_operation(operation, model, using):
+    """
+    Runs ``operation`` on the objects of ``model``, the first model of the
+    graph. ``cascade_counts`` computes the counts of the summary confirmation
+    pages of the admin actions.
+    """
+    from logicaldelete.deletion import get_cascade_counts
+    from logicaldelete.purge import purge
+
+    manager = model.objects.db_manager(using)
+    if operation == 'delete':
+        manager.all().delete()
+    elif operation == 'undelete':
+        manager.only_deleted().undelete()
+    elif operation == 'delete_complete':
+        manager.everything().delete_complete()
+    elif operation == 'purge':
+        purge(model, older_than=now(), using=using)
+    elif operation == 'cascade_counts':
+        get_cascade_counts(manager.all())
+    else:
+        raise ValueError('Unknown operation %r.' % operation)
+
+
+def measure(func, using, memory=True):
+    """
+    Runs ``func`` and returns its wall time in seconds, the number of queries
+    it runs on ``using`` and its peak of allocated memory in bytes, None
+    without ``memory`` or tracemalloc. Tracing memory slows ``func`` down.
+    """
+    memory = memory and tracemalloc is not None
+    if memory:
+        tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connections[using]) as queries:
+            start = time.time()
+            func()
+            wall_time = time.time() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return {'wall_time': wall_time, 'queries': len(queries), 'peak_memory': peak_memory}
+
+
+def run_benchmark(depth=3, fan_out=5, roots=100, deleted_ratio=0.1, operations=OPERATIONS, repeat=1,
+                  memory=True, using=DEFAULT_DB_ALIAS, progress=None):
+    """
+    Runs every operation of ``operations`` ``repeat`` times, each time on a
+    freshly created graph. ``progress`` is called with the operation and its
+    result after every run.
+
+    Returns a dictionary that can be serialized as JSON with the environment,
+    the parameters and the results: the number of objects in the graph, and
+    the wall time, number of queries and peak memory of every run.
+    """
+    results = []
+    for operation in operations:
+        for _ in range(repeat):
+            objects = create_graph(depth, roots, fan_out, deleted_ratio, using)
+            try:
+                result = measure(lambda: run_operation(operation, _models[0], using), using, memory=memory)
+            finally:
+                drop_graph(using)
+            result.update(operation=operation, objects=objects)
+            results.append(result)
+            if progress is not None:
+                progress(operation, result)
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'vendor': connections[using].vendor,
+            'date': now().isoformat(),
+        },
+        'parameters': {
+            'depth': depth,
+            'fan_out': fan_out,
+            'roots': roots,
+            'deleted_ratio': deleted_ratio,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
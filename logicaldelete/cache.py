@@ -0,0 +1,104 @@
+# coding=utf-8
+import hashlib
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import connections
+from django.utils.encoding import force_bytes
+
+
+def get_cache():
+    return caches[getattr(settings, 'LOGICALDELETE_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)]
+
+
+def get_generation_key(model):
+    return 'logicaldelete:generation:%s' % model._meta.concrete_model._meta.label_lower
+
+
+def get_generation(model):
+    """
+    Returns the generation of ``model``, a random value that changes every
+    time a `LogicalDeleteCollector` deletes or restores objects of the model,
+    or they are deleted completely. Cache keys built with it are never read
+    again after the objects change, evicted generations are never reused.
+    """
+    cache = get_cache()
+    key = get_generation_key(model)
+    generation = cache.get(key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def bump_generation(model):
+    get_cache().set(get_generation_key(model), uuid.uuid4().hex, None)
+
+
+def get_sql_models(sql, using):
+    """
+    Returns the models whose tables ``sql`` reads, in joins, subqueries and
+    combined queries too.
+    """
+    quote_name = connections[using].ops.quote_name
+    return set(
+        model for model in apps.get_models(include_auto_created=True)
+        if not model._meta.proxy and quote_name(model._meta.db_table) in sql
+    )
+
+
+def get_prefetch_models(model, lookups, using):
+    """
+    Returns the models `prefetch_related()` reads for ``lookups`` on
+    ``model``, intermediate and many to many through models included, and
+    a description of the lookups for cache keys.
+    """
+    from logicaldelete.query import get_relation
+
+    models, description = set(), []
+    for lookup in lookups:
+        path = getattr(lookup, 'prefetch_through', lookup)
+        queryset = getattr(lookup, 'queryset', None)
+        if queryset is not None:
+            sql, params = queryset.query.sql_with_params()
+            models.update(get_sql_models(sql, using))
+            description.append((lookup.prefetch_to, sql, params))
+        else:
+            description.append(getattr(lookup, 'prefetch_to', path))
+
+        current = model
+        for name in path.split('__'):
+            relation = get_relation(current, name) if current is not None else None
+            if relation is None:
+                break
+            current = relation.related_model
+            if current is not None:
+                models.add(current)
+            if relation.many_to_many:
+                through = getattr(relation, 'through', None) or relation.remote_field.through
+                models.add(through)
+    return models, description
+
+
+def get_queryset_key(queryset):
+    """
+    Returns a cache key for the results of ``queryset``, built with the
+    generations of the models it reads, prefetched relations included.
+    """
+    sql, params = queryset.query.sql_with_params()
+    models = get_sql_models(sql, queryset.db)
+    prefetch_models, prefetches = get_prefetch_models(
+        queryset.model, queryset._prefetch_related_lookups, queryset.db)
+    models = sorted(models | prefetch_models, key=lambda model: model._meta.label)
+    return 'logicaldelete:queryset:%s:%s' % (
+        queryset.model._meta.label_lower,
+        hashlib.md5(force_bytes(repr((
+            [(model._meta.label, get_generation(model)) for model in models],
+            queryset.db, sql, params, queryset._iterable_class.__name__, prefetches,
+            getattr(queryset, '_with_archive', False), getattr(queryset, '_as_of', None),
+            type(queryset.query).__name__,
+        )))).hexdigest(),
+    )
@@ -0,0 +1,64 @@
+# coding=utf-8
+from django.core import checks
+from django.db import connections, router
+
+from logicaldelete.deletion import get_options
+from logicaldelete.indexes import ActiveIndex, DeletedIndex, LiveUniqueIndex
+
+
+@checks.register(checks.Tags.models)
+def check_partial_indexes(app_configs=None, **kwargs):
+    """
+    Warns about concrete `LogicalModel` subclasses whose live rows or deleted
+    rows lookups are not backed by a partial index.
+    """
+    from logicaldelete.models import get_logical_models
+
+    errors = []
+    for model in get_logical_models():
+        if app_configs is not None and model._meta.app_config not in app_configs:
+            continue
+        if not model._meta.managed:
+            continue
+
+        for index_class, id, lookup in ((ActiveIndex, 'logicaldelete.W001', 'date_removed IS NULL'),
+                                        (DeletedIndex, 'logicaldelete.W002', 'date_removed IS NOT NULL')):
+            if not any(isinstance(index, index_class) for index in model._meta.indexes):
+                errors.append(checks.Warning(
+                    "%s has no %s, queries filtering on '%s' can't use a partial index." % (
+                        model._meta.label, index_class.__name__, lookup),
+                    hint="Enable LogicalDeleteMeta.partial_indexes or add %s to Meta.indexes." % (
+                        index_class.__name__),
+                    obj=model,
+                    id=id,
+                ))
+    return errors
+
+
+@checks.register(checks.Tags.models, checks.Tags.database)
+def check_unique_live(app_configs=None, **kwargs):
+    """
+    Fails for `LogicalModel` subclasses with ``unique_live`` migrated to
+    databases without partial indexes, where `LiveUniqueIndex` is a plain
+    index and nothing in the database keeps the live rows unique.
+    """
+    from logicaldelete.models import get_logical_models
+
+    errors = []
+    for model in get_logical_models():
+        if app_configs is not None and model._meta.app_config not in app_configs:
+            continue
+        if not model._meta.managed or not get_options(model).unique_live:
+            continue
+
+        for alias in connections:
+            vendor = connections[alias].vendor
+            if vendor not in LiveUniqueIndex.supported_vendors and router.allow_migrate_model(alias, model):
+                errors.append(checks.Error(
+                    "%s uses LogicalDeleteMeta.unique_live, but the %s database '%s' has no partial "
+                    "indexes, so the database doesn't keep live rows unique." % (model._meta.label, vendor, alias),
+                    hint="Use Meta.unique_together on this database instead.",
+                    obj=model,
+                    id='logicaldelete.E001',
+                ))
+    return errors
@@ -0,0 +1,66 @@
+# coding=utf-8
+import hashlib
+import json
+
+from django.db import connections
+from django.utils import six
+from django.utils.encoding import force_bytes
+
+from logicaldelete.cache import get_cache, get_generation
+
+
+def estimate_count(queryset):
+    """
+    Returns the number of rows of ``queryset`` estimated by the PostgreSQL
+    planner, or None on other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) %s' % sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, six.string_types):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def cached_count(queryset, timeout=300):
+    """
+    Returns the number of rows of ``queryset``, cached for ``timeout`` seconds
+    or until the collector deletes or restores objects of the model.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    key = 'logicaldelete:count:%s:%s:%s' % (
+        queryset.model._meta.label_lower,
+        get_generation(queryset.model),
+        hashlib.md5(force_bytes(repr((queryset.db, sql, params)))).hexdigest(),
+    )
+    cache = get_cache()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.with_count_strategy(None).count()
+        cache.set(key, count, timeout)
+    return count
+
+
+def get_count(queryset, strategy, exact_below=1000, timeout=300):
+    """
+    Returns the number of rows of ``queryset`` with ``strategy``:
+
+    * ``'estimate'``: the planner estimate on PostgreSQL. Estimates below
+      ``exact_below`` and other databases use an exact count.
+    * ``'cached'``: see `cached_count`.
+    """
+    if strategy == 'estimate':
+        count = estimate_count(queryset)
+        if count is not None and count >= exact_below:
+            return count
+    elif strategy == 'cached':
+        return cached_count(queryset, timeout=timeout)
+    elif strategy is not None:
+        raise ValueError("Unknown count strategy %r." % strategy)
+
+    return queryset.with_count_strategy(None).count()
@@ -1,13 +1,26 @@
 # -*- coding: utf-8; -*-
-from collections import Counter
+import time
+import uuid
+from array import array
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from operator import attrgetter
 
 from django.db.models.fields import FieldDoesNotExist
-from django.db import transaction
-from django.db.models.deletion import Collector, sql, signals
+from django.db import OperationalError, connections, transaction
+from django.db.backends.utils import CursorWrapper
+from django.db.models.sql.constants import GET_ITERATOR_CHUNK_SIZE
+from django.db.models.deletion import (
+    CASCADE, DO_NOTHING, PROTECT, Collector, get_candidate_relations_to_delete, sql, signals,
+)
 from django.utils.timezone import now
 from django.utils import six
 
+from logicaldelete.cache import bump_generation
+from logicaldelete.signals import (
+    post_logical_delete_bulk, post_logical_undelete_bulk, pre_logical_delete_bulk, pre_logical_undelete_bulk,
+)
+
 
 class LogicalDeleteOptions(object):
     """
@@ -16,16 +29,678 @@ class LogicalDeleteOptions(object):
 
     delete_related = True
     safe_deletion = True
+    # Soft delete and restore querysets in chunks of ``delete_batch_size`` rows,
+    # each one in its own transaction, sleeping ``delete_batch_sleep`` seconds
+    # between them.
     delete_batches = False
+    delete_batch_size = 1000
+    delete_batch_sleep = 0
+    # Cascade with UPDATE ... WHERE fk IN (SELECT ...) when nothing listens to
+    # the delete signals, instead of loading the related instances.
+    set_based = True
+    # When the set based cascade isn't possible, like on self referencing
+    # trees, collect only the primary keys if nothing needs the instances.
+    pk_collection = True
+    # Lock the collected rows before updating them, in model label and
+    # primary key order, so concurrent deletes don't deadlock: 'wait',
+    # 'nowait' or 'skip_locked', which leaves out the rows locked by others.
+    # Failed deletes are retried ``lock_retries`` times.
+    locking = None
+    lock_retries = 3
+    lock_retry_delay = 0.1
+    # Keep the number of active and deleted objects in `LogicalDeleteCounter`.
+    counters = False
+    # Add `ActiveIndex` and `DeletedIndex` over ``date_removed`` to the model.
+    partial_indexes = True
+    # Add `AsOfIndex` over ``(date_removed, date_created)`` for as_of() queries.
+    as_of_index = False
+    # How long deleted objects are kept before `logicaldelete.purge` deletes
+    # them completely, a timedelta or a number of days. None keeps them.
+    retention = None
+    # Sets of fields unique among live rows, enforced with `LiveUniqueIndex`.
+    # True turns Meta.unique_together into live only unique indexes.
+    unique_live = ()
+    # Move logically deleted rows to a ``<db_table>_archive`` table, see
+    # `logicaldelete.archive`. With ``archive_on_delete`` they are moved as
+    # soon as they are deleted, otherwise by `archive_all` sweeps.
+    archive = False
+    archive_on_delete = False
+    # Send pre_delete and post_delete for every object. Turn them off when
+    # the receivers use `logicaldelete.signals`, so deletes don't need the
+    # instances.
+    instance_signals = True
+    # Append the primary keys of the deleted and restored objects to
+    # `LogicalDeleteEvent`, for consumers mirroring them.
+    change_feed = False
+    # The archive model, created by `prepare_logical_model`.
+    archive_model = None
 
     def __init__(self, opts):
         if opts:
-            for key, value in opts.__dict__.iteritems():
-                setattr(self, key, value)
+            for key, value in six.iteritems(opts.__dict__):
+                if not key.startswith('_'):
+                    setattr(self, key, value)
+
+
+def get_options(model):
+    """
+    Returns the `LogicalDeleteOptions` of ``model``, or the defaults for models
+    that don't inherit from `LogicalModel`.
+    """
+    return getattr(model, '_logicaldelete', None) or LogicalDeleteOptions(None)
+
+
+def has_field(model, name):
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def has_instance_signals(model):
+    """
+    Returns whether deleting objects of ``model`` sends per object signals
+    with receivers.
+    """
+    return get_options(model).instance_signals and (
+        signals.pre_delete.has_listeners(model) or signals.post_delete.has_listeners(model))
+
+
+def run_with_retries(func, using, retries=0, delay=0):
+    """
+    Calls ``func`` and returns its result, calling it again up to ``retries``
+    times, sleeping ``delay`` seconds more every time, when the database aborts
+    it with an operational error like a deadlock, a serialization failure or
+    a lock not available. Never retries inside a transaction, which is broken
+    after the error.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except OperationalError:
+            if attempt >= retries or connections[using].in_atomic_block:
+                raise
+            attempt += 1
+            time.sleep(delay * attempt)
+
+
+def pk_array(model):
+    """
+    Returns an empty container for primary keys of ``model``, a compact array
+    for integer keys.
+    """
+    if model._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField'):
+        return array('q' if six.PY3 else 'l')
+    return []
+
+
+def get_cascade_models(model):
+    """
+    Returns ``model`` and every model its deletion cascades to, parents
+    before their children.
+    """
+    models, pending = [], [model]
+    while pending:
+        current = pending.pop(0)
+        if current in models:
+            continue
+        models.append(current)
+        for related in get_candidate_relations_to_delete(current._meta):
+            if related.field.remote_field.on_delete is CASCADE:
+                pending.append(related.related_model)
+    return models
+
+
+def get_model_levels(models):
+    """
+    Returns the level of every model of ``models``: one more than the highest
+    level of the models of ``models`` it has a foreign key to, 0 for models
+    referencing none. Reference cycles are broken arbitrarily.
+    """
+    levels = {}
+
+    def get_level(model, path):
+        if model not in levels:
+            parents = [
+                field.related_model for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model in models and
+                field.related_model is not model and field.related_model not in path
+            ]
+            levels[model] = 1 + max([get_level(parent, path + (model,)) for parent in parents] or [-1])
+        return levels[model]
+
+    for model in models:
+        get_level(model, ())
+    return levels
+
+
+def get_cascade_counts(objs, only_deleted=False, max_depth=32):
+    """
+    Returns a ``Counter`` with the number of objects of every model ``objs``
+    cascades to, ``objs`` included, and a list of querysets with the objects
+    protecting them from deletion. Uses COUNT queries over the relation graph
+    instead of loading the instances. With ``only_deleted``, only the logically
+    deleted objects are counted, the ones a restore changes.
+    """
+    counts, protected = Counter(), []
+
+    def count(qs, depth):
+        model = qs.model
+        counted = qs.filter(date_removed__isnull=False) if only_deleted and has_field(model, 'date_removed') else qs
+        n = counted.count()
+        if not n:
+            return
+        counts[model] += n
+
+        if depth >= max_depth:
+            return
+        for related in get_candidate_relations_to_delete(model._meta):
+            on_delete = related.field.remote_field.on_delete
+            sub_objs = related.related_model._base_manager.using(qs.db).filter(
+                **{"%s__in" % related.field.name: qs}
+            )
+            if on_delete is CASCADE:
+                count(sub_objs, depth + 1)
+            elif on_delete is PROTECT and sub_objs.exists():
+                protected.append(sub_objs)
+
+    count(objs, 0)
+    return counts, protected
+
+
+class CountingCursorWrapper(CursorWrapper):
+    """
+    Cursor adding the queries it runs to a `LogicalDeleteStats`.
+    """
+
+    def __init__(self, cursor, db, stats):
+        super(CountingCursorWrapper, self).__init__(cursor, db)
+        self.stats = stats
+
+    def callproc(self, *args, **kwargs):
+        self.stats.queries += 1
+        return super(CountingCursorWrapper, self).callproc(*args, **kwargs)
+
+    def execute(self, sql, params=None):
+        self.stats.queries += 1
+        return super(CountingCursorWrapper, self).execute(sql, params)
+
+    def executemany(self, sql, param_list):
+        self.stats.queries += 1
+        return super(CountingCursorWrapper, self).executemany(sql, param_list)
+
+
+class LogicalDeleteStats(object):
+    """
+    Number of queries, number of loaded instances and seconds spent per phase
+    (collect, lock, signals, field_updates, updates, archive) by the collectors it's passed
+    to, see `LogicalDeleteCollector`. One object can be shared by several
+    collectors, like the batches of a queryset delete, to add them up.
+
+    Queries are counted by wrapping the cursors of the connection while a
+    phase runs, the queries log of the connection is left alone.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.instances = 0
+        self.timings = OrderedDict()
+        self._phases = []
+        self._started = None
+
+    def __repr__(self):
+        return '<%s: %d queries, %d instances, %s>' % (
+            self.__class__.__name__, self.queries, self.instances,
+            ', '.join('%s %.3fs' % item for item in six.iteritems(self.timings)))
+
+    @property
+    def total_time(self):
+        return sum(six.itervalues(self.timings))
+
+    def _charge(self):
+        # Adds the time since the last change of phase to the current one.
+        current = time.time()
+        if self._phases:
+            name = self._phases[-1]
+            self.timings[name] = self.timings.get(name, 0) + current - self._started
+        self._started = current
+
+    @contextmanager
+    def phase(self, name, using):
+        """
+        Charges the time spent in the block to phase ``name``, less the time
+        spent in nested phases, and counts the queries run on ``using``.
+        """
+        if name in self._phases:
+            # recursive collect() calls
+            yield
+            return
+
+        connection = connections[using]
+        if not self._phases:
+            # Instance attributes shadowing the methods, None if there are none.
+            wrapped = [(attr, connection.__dict__.get(attr)) for attr in ('make_cursor', 'make_debug_cursor')]
+            for attr, _ in wrapped:
+                setattr(connection, attr, self._counting(getattr(connection, attr), connection))
+
+        self._charge()
+        self._phases.append(name)
+        try:
+            yield
+        finally:
+            self._charge()
+            self._phases.pop()
+            if not self._phases:
+                for attr, previous in wrapped:
+                    if previous is None:
+                        delattr(connection, attr)
+                    else:
+                        setattr(connection, attr, previous)
+
+    def _counting(self, make_cursor, connection):
+        # Returns ``make_cursor`` of ``connection`` with the queries of its
+        # cursors added to self.queries.
+        def make_counting_cursor(cursor):
+            return CountingCursorWrapper(make_cursor(cursor), connection, self)
+        return make_counting_cursor
+
+
+@contextmanager
+def no_stats():
+    yield
 
 
 class LogicalDeleteCollector(Collector):
 
+    # Databases supporting UPDATE ... RETURNING in common table expressions,
+    # where the set based cascade runs in one round trip.
+    cte_vendors = ('postgresql',)
+    # Leave the cascades handled by the triggers of logicaldelete_triggers to
+    # the database.
+    use_triggers = True
+
+    def __init__(self, using, stats=None, locking=None):
+        super(LogicalDeleteCollector, self).__init__(using)
+        # `LogicalDeleteStats` filled by this collector, if any.
+        self.stats = stats
+        # see ``LogicalDeleteMeta.locking`` and lock_rows().
+        self.locking = locking
+        # querysets updated in order with a single UPDATE each, children
+        # before their parents.
+        self.set_updates = []
+        # primary keys per model updated in chunks, see get_pk_updates().
+        self.pk_updates = OrderedDict()
+        # models the database triggers may update, see logicaldelete.triggers.
+        self.trigger_models = set()
+        # names of the installed triggers, read once per collector.
+        self.installed_triggers = None
+        # stamped on every object deleted by this collector, undelete restores
+        # whole batches.
+        self.deletion_batch = None
+
+    def phase(self, name):
+        """
+        Context manager timing the block as phase ``name`` in `stats`.
+        """
+        if self.stats is None:
+            return no_stats()
+        return self.stats.phase(name, self.using)
+
+    def get_update_values(self, model, date_removed):
+        values = {'date_removed': date_removed}
+        if has_field(model, 'deletion_batch'):
+            values['deletion_batch'] = self.deletion_batch if date_removed is not None else None
+        return values
+
+    def as_queryset(self, objs):
+        """
+        Returns ``objs`` as a queryset, without evaluating querysets, or None
+        for an empty list.
+        """
+        if hasattr(objs, 'model'):
+            return objs
+        if not objs:
+            return None
+        model = objs[0].__class__
+        return model._base_manager.using(self.using).filter(pk__in=[obj.pk for obj in objs])
+
+    def collect(self, objs, source=None, nullable=False, collect_related=True,
+                source_attr=None, reverse_dependency=False, keep_parents=False):
+        with self.phase('collect'):
+            if source is None and collect_related and self.as_queryset(objs) is not None:
+                set_updates = self.get_set_updates(self.as_queryset(objs))
+                if set_updates is not None:
+                    self.set_updates.extend(set_updates)
+                    return
+
+                pk_updates = self.get_pk_updates(self.as_queryset(objs))
+                if pk_updates is not None:
+                    for model, pks in six.iteritems(pk_updates):
+                        self.pk_updates.setdefault(model, pk_array(model)).extend(pks)
+                    return
+
+            return super(LogicalDeleteCollector, self).collect(
+                objs, source=source, nullable=nullable, collect_related=collect_related,
+                source_attr=source_attr, reverse_dependency=reverse_dependency,
+                keep_parents=keep_parents
+            )
+
+    def collect_batches(self, objs):
+        """
+        Collects, for undelete(), every object deleted in the same deletion
+        batches as the deleted ``objs``, one indexed queryset per model
+        instead of walking the relations. Returns False, collecting nothing,
+        when ``objs`` were deleted without batch, don't include every root
+        object of their batches or signal receivers need the instances.
+        """
+        objs = self.as_queryset(objs)
+        if objs is None or not has_field(objs.model, 'deletion_batch'):
+            return False
+        model = objs.model
+
+        deleted = objs.filter(date_removed__isnull=False)
+        if deleted.filter(deletion_batch__isnull=True).exists():
+            return False
+        batches = list(set(deleted.values_list('deletion_batch', flat=True)))
+        if model._base_manager.using(self.using).filter(deletion_batch__in=batches).exclude(
+                pk__in=objs.values('pk')).exists():
+            return False
+
+        models = [related_model for related_model in get_cascade_models(model)
+                  if has_field(related_model, 'deletion_batch')]
+        if any(has_instance_signals(related_model) for related_model in models):
+            return False
+
+        for related_model in reversed(models):
+            self.set_updates.append(
+                related_model._base_manager.using(self.using).filter(deletion_batch__in=batches)
+            )
+        return True
+
+    def collect_undelete(self, objs, keep_parents=False):
+        """
+        Collects the objects undelete() restores: their deletion batches if
+        possible, see `collect_batches`, otherwise their cascade.
+        """
+        with self.phase('collect'):
+            if not self.collect_batches(objs):
+                self.collect(objs, keep_parents=keep_parents)
+
+    def get_set_updates(self, objs, path=()):
+        """
+        Returns the querysets of ``objs`` and every object they cascade to,
+        children first, or None if the cascade needs the instances: signal
+        receivers, parent models, generic relations, cycles or on_delete
+        handlers other than CASCADE and DO_NOTHING.
+        """
+        model = objs.model
+        opts = model._meta
+
+        if (model in path or opts.parents or not has_field(model, 'date_removed') or
+                not get_options(model).set_based or has_instance_signals(model)):
+            return None
+
+        if any(hasattr(field, 'bulk_related_objects') for field in opts.private_fields):
+            return None
+
+        set_updates = []
+        for related in get_candidate_relations_to_delete(opts):
+            on_delete = related.field.remote_field.on_delete
+            if on_delete is DO_NOTHING:
+                continue
+            if on_delete is not CASCADE:
+                return None
+            # Auto created m2m tables don't have date_removed.
+            if related.related_model._meta.auto_created:
+                continue
+            # Database triggers cascade to these, see logicaldelete.triggers.
+            if self.use_triggers:
+                from logicaldelete.triggers import get_installed_triggers, is_cascaded_by_triggers
+                if self.installed_triggers is None:
+                    self.installed_triggers = get_installed_triggers(self.using)
+                if is_cascaded_by_triggers(related, self.using, installed=self.installed_triggers):
+                    self.trigger_models.update(get_cascade_models(related.related_model))
+                    continue
+
+            sub_updates = self.get_set_updates(self.related_objects(related, objs), path=path + (model,))
+            if sub_updates is None:
+                return None
+            set_updates.extend(sub_updates)
+
+        set_updates.append(objs)
+        return set_updates
+
+    def get_pk_updates(self, objs):
+        """
+        Returns an ``OrderedDict`` with the primary keys of ``objs`` and of
+        every object they cascade to per model, fetched level by level with
+        values_list() instead of loading the instances, or None if the cascade
+        needs them: signal receivers, parent models, generic relations,
+        relations to other fields than the primary key or on_delete handlers
+        other than CASCADE and DO_NOTHING. Cycles, like trees of self
+        referencing objects, are followed until no new objects are found.
+        """
+        pk_updates, seen = OrderedDict(), {}
+        pending = [(objs.model, list(objs.values_list('pk', flat=True)))]
+        while pending:
+            model, pks = pending.pop(0)
+            opts = model._meta
+            if (opts.parents or not has_field(model, 'date_removed') or
+                    not get_options(model).pk_collection or has_instance_signals(model) or
+                    any(hasattr(field, 'bulk_related_objects') for field in opts.private_fields)):
+                return None
+
+            model_seen = seen.setdefault(model, set())
+            pks = [pk for pk in pks if pk not in model_seen]
+            if not pks:
+                continue
+            model_seen.update(pks)
+            pk_updates.setdefault(model, pk_array(model)).extend(pks)
+
+            for related in get_candidate_relations_to_delete(opts):
+                on_delete = related.field.remote_field.on_delete
+                if on_delete is DO_NOTHING or related.related_model._meta.auto_created:
+                    continue
+                if on_delete is not CASCADE or not related.field.target_field.primary_key:
+                    return None
+                related_pks = []
+                for offset in range(0, len(pks), GET_ITERATOR_CHUNK_SIZE):
+                    related_pks.extend(self.related_objects(
+                        related, pks[offset:offset + GET_ITERATOR_CHUNK_SIZE]).values_list('pk', flat=True))
+                if related_pks:
+                    pending.append((related.related_model, related_pks))
+        return pk_updates
+
+    def update_pk_updates(self, date_removed):
+        """
+        Runs the primary key based updates in chunks and returns a
+        ``Counter`` with the number of updated rows per model.
+
+        Models are updated before the models they reference, like the set
+        based updates, so the database triggers of their parents find nothing
+        left to change and every row is counted, see logicaldelete.triggers.
+        """
+        deleted_counter = Counter()
+        levels = get_model_levels(list(self.pk_updates))
+        for model in sorted(self.pk_updates, key=lambda model: -levels[model]):
+            pks = self.pk_updates[model]
+            for offset in range(0, len(pks), GET_ITERATOR_CHUNK_SIZE):
+                deleted_counter[model] += model._base_manager.using(self.using).filter(
+                    pk__in=list(pks[offset:offset + GET_ITERATOR_CHUNK_SIZE]),
+                    date_removed__isnull=date_removed is not None,
+                ).update(**self.get_update_values(model, date_removed))
+        return deleted_counter
+
+    def lock_rows(self):
+        """
+        Locks the rows of the collected objects with SELECT ... FOR UPDATE,
+        models in label order and rows in primary key order, so concurrent
+        collectors take the locks of overlapping objects in the same order
+        and wait for each other instead of deadlocking.
+
+        The set based updates become primary key updates, and with
+        ``skip_locked`` the objects locked by others are left out, with the
+        rest of their cascade, see `drop_skipped`.
+        """
+        pks_per_model = {}
+        for qs in self.set_updates + self.fast_deletes:
+            if has_field(qs.model, 'date_removed'):
+                pks_per_model.setdefault(qs.model, set()).update(qs.values_list('pk', flat=True))
+        for model, pks in six.iteritems(self.pk_updates):
+            pks_per_model.setdefault(model, set()).update(pks)
+        for model, instances in six.iteritems(self.data):
+            if has_field(model, 'date_removed'):
+                pks_per_model.setdefault(model, set()).update(obj.pk for obj in instances)
+
+        locked_per_model = {}
+        for model in sorted(pks_per_model, key=lambda model: model._meta.label):
+            pks = sorted(pks_per_model[model])
+            locked = locked_per_model[model] = set()
+            for offset in range(0, len(pks), GET_ITERATOR_CHUNK_SIZE):
+                locked.update(self.lock_pks(model, pks[offset:offset + GET_ITERATOR_CHUNK_SIZE]))
+        if self.locking == 'skip_locked':
+            self.drop_skipped(pks_per_model, locked_per_model)
+
+        data_models = set(self.data)
+        self.set_updates = []
+        self.fast_deletes = [qs for qs in self.fast_deletes if not has_field(qs.model, 'date_removed')]
+        self.pk_updates = OrderedDict()
+        for model, locked in six.iteritems(locked_per_model):
+            if model in data_models:
+                self.data[model] = [obj for obj in self.data[model] if obj.pk in locked]
+                locked = locked - set(obj.pk for obj in self.data[model])
+            if locked:
+                self.pk_updates[model] = pk_array(model)
+                self.pk_updates[model].extend(sorted(locked))
+
+    def lock_pks(self, model, pks):
+        """
+        Locks the rows of ``model`` with primary keys ``pks`` in primary key
+        order and returns the primary keys of the locked ones.
+        """
+        return model._base_manager.using(self.using).filter(pk__in=pks).select_for_update(
+            nowait=self.locking == 'nowait', skip_locked=self.locking == 'skip_locked'
+        ).order_by('pk').values_list('pk', flat=True)
+
+    def drop_skipped(self, pks_per_model, locked_per_model):
+        """
+        Removes from ``locked_per_model`` the objects skipped because others
+        locked them, with every collected object cascading to them or they
+        cascade to: the whole cascade of a collected object is deleted, or
+        none of it, so no live object gets deleted children or parents.
+        """
+        dropped = dict(
+            (model, pks_per_model[model] - locked) for model, locked in six.iteritems(locked_per_model)
+        )
+        pending = [(model, pks) for model, pks in six.iteritems(dropped) if pks]
+
+        def drop(model, pks):
+            pks = (set(pks) & locked_per_model[model]) - dropped[model]
+            if pks:
+                dropped[model].update(pks)
+                pending.append((model, pks))
+
+        while pending:
+            model, pks = pending.pop()
+            pks = list(pks)
+            for offset in range(0, len(pks), GET_ITERATOR_CHUNK_SIZE):
+                objs = model._base_manager.using(self.using).filter(pk__in=pks[offset:offset + GET_ITERATOR_CHUNK_SIZE])
+                # the collected children
+                for related in get_candidate_relations_to_delete(model._meta):
+                    child = related.related_model
+                    if related.field.remote_field.on_delete is CASCADE and child in locked_per_model:
+                        drop(child, child._base_manager.using(self.using).filter(
+                            **{'%s__in' % related.field.name: objs}).values_list('pk', flat=True))
+                # the collected parents
+                for field in model._meta.concrete_fields:
+                    parent = field.related_model
+                    if field.is_relation and field.remote_field.on_delete is CASCADE and parent in locked_per_model:
+                        drop(parent, parent._base_manager.using(self.using).filter(
+                            **{'%s__in' % field.target_field.name: objs.values(field.attname)}
+                        ).values_list('pk', flat=True))
+
+        for model, pks in six.iteritems(dropped):
+            locked_per_model[model] -= pks
+
+    def get_set_updates_sql(self, date_removed):
+        """
+        Returns the models of the set based updates, merged per model, and the
+        SQL and params of one statement running every update as a data
+        modifying common table expression and selecting their row counts.
+        All of them see the rows as they were before the statement, like the
+        children first updates of the generic path.
+        """
+        merged = OrderedDict()
+        for qs in self.set_updates:
+            merged[qs.model] = merged[qs.model] | qs if qs.model in merged else qs
+
+        ctes, counts, params = [], [], []
+        for i, (model, qs) in enumerate(six.iteritems(merged)):
+            query = qs.filter(date_removed__isnull=date_removed is not None).query.clone(sql.UpdateQuery)
+            query.add_update_values(self.get_update_values(model, date_removed))
+            query._annotations = None
+            compiler = query.get_compiler(self.using)
+            update_sql, update_params = compiler.as_sql()
+            ctes.append('u%d AS (%s RETURNING 1)' % (i, update_sql))
+            counts.append('(SELECT COUNT(*) FROM u%d)' % i)
+            params.extend(update_params)
+
+        return list(merged), 'WITH %s SELECT %s' % (', '.join(ctes), ', '.join(counts)), params
+
+    def update_set_updates(self, date_removed):
+        """
+        Runs the set based updates and returns a ``Counter`` with the number
+        of updated rows per model. On `cte_vendors` the whole cascade is a
+        single statement, see `get_set_updates_sql`.
+        """
+        deleted_counter = Counter()
+        connection = connections[self.using]
+        if len(self.set_updates) > 1 and connection.vendor in self.cte_vendors:
+            models, statement, params = self.get_set_updates_sql(date_removed)
+            with connection.cursor() as cursor:
+                cursor.execute(statement, params)
+                deleted_counter.update(dict(zip(models, cursor.fetchone())))
+            return deleted_counter
+
+        for qs in self.set_updates:
+            deleted_counter[qs.model] += qs.filter(date_removed__isnull=date_removed is not None).update(
+                **self.get_update_values(qs.model, date_removed))
+        return deleted_counter
+
+    def get_bulk_pks(self, date_removed, bulk_signals):
+        """
+        Returns the primary keys of the collected objects whose state changes
+        to ``date_removed``, per model with receivers of ``bulk_signals`` or
+        ``LogicalDeleteMeta.change_feed``.
+        """
+        bulk_pks = OrderedDict()
+
+        def add(model, pks):
+            if pks:
+                bulk_pks.setdefault(model, []).extend(pks)
+
+        def needs_pks(model):
+            return get_options(model).change_feed or any(signal.has_listeners(model) for signal in bulk_signals)
+
+        querysets = self.set_updates + [qs for qs in self.fast_deletes if has_field(qs.model, 'date_removed')]
+        for qs in querysets:
+            if needs_pks(qs.model):
+                add(qs.model, list(qs.filter(date_removed__isnull=date_removed is not None).values_list(
+                    'pk', flat=True)))
+        for model, pks in six.iteritems(self.pk_updates):
+            if needs_pks(model):
+                for offset in range(0, len(pks), GET_ITERATOR_CHUNK_SIZE):
+                    add(model, list(model._base_manager.using(self.using).filter(
+                        pk__in=list(pks[offset:offset + GET_ITERATOR_CHUNK_SIZE]),
+                        date_removed__isnull=date_removed is not None,
+                    ).values_list('pk', flat=True)))
+        for model, instances in six.iteritems(self.data):
+            if has_field(model, 'date_removed') and needs_pks(model):
+                add(model, [obj.pk for obj in instances if (obj.date_removed is None) == (date_removed is not None)])
+        return bulk_pks
+
     def delete_undelete(self, date_removed):
         # sort instance collections
         for model, instances in self.data.items():
@@ -35,32 +710,54 @@ class LogicalDeleteCollector(Collector):
         # don't support transactions or cannot defer constraint checks until the
         # end of a transaction.
         self.sort()
-        # number of objects deleted for each model label
+        # number of objects deleted for each model
         deleted_counter = Counter()
 
+        if self.stats is not None:
+            self.stats.instances += sum(len(instances) for instances in six.itervalues(self.data))
+
         with transaction.atomic(using=self.using, savepoint=False):
+            if self.locking:
+                with self.phase('lock'):
+                    self.lock_rows()
+
             # send pre_delete signals
-            for model, obj in self.instances_with_model():
-                if not model._meta.auto_created:
-                    signals.pre_delete.send(
-                        sender=model, instance=obj, using=self.using
-                    )
+            with self.phase('signals'):
+                for model, obj in self.instances_with_model():
+                    if not model._meta.auto_created and get_options(model).instance_signals:
+                        signals.pre_delete.send(
+                            sender=model, instance=obj, using=self.using
+                        )
 
-            # fast deletes
-            for qs in self.fast_deletes:
-                # We avoid to send an error when I try to update tables in many to many relationships
-                try:
-                    qs.update(date_removed=date_removed)
-                    # deleted_counter[qs.model._meta.label] += count
-                except FieldDoesNotExist:
-                    pass
+                # send one bulk signal per model
+                if date_removed is not None:
+                    pre_bulk, post_bulk = pre_logical_delete_bulk, post_logical_delete_bulk
+                else:
+                    pre_bulk, post_bulk = pre_logical_undelete_bulk, post_logical_undelete_bulk
+                bulk_pks = self.get_bulk_pks(date_removed, (pre_bulk, post_bulk))
+                for model, pks in six.iteritems(bulk_pks):
+                    pre_bulk.send(sender=model, pks=pks, date_removed=date_removed, using=self.using)
+
+            with self.phase('updates'):
+                # set based updates, only touching the rows that change state
+                deleted_counter.update(self.update_set_updates(date_removed))
+                deleted_counter.update(self.update_pk_updates(date_removed))
+
+                # fast deletes
+                for qs in self.fast_deletes:
+                    # We avoid to send an error when I try to update tables in many to many relationships
+                    if has_field(qs.model, 'date_removed'):
+                        count = qs.filter(date_removed__isnull=date_removed is not None).update(
+                            **self.get_update_values(qs.model, date_removed))
+                        deleted_counter[qs.model] += count
 
             # update fields
-            for model, instances_for_fieldvalues in six.iteritems(self.field_updates):
-                query = sql.UpdateQuery(model)
-                for (field, value), instances in six.iteritems(instances_for_fieldvalues):
-                    query.update_batch([obj.pk for obj in instances],
-                                       {field.name: value}, self.using)
+            with self.phase('field_updates'):
+                for model, instances_for_fieldvalues in six.iteritems(self.field_updates):
+                    query = sql.UpdateQuery(model)
+                    for (field, value), instances in six.iteritems(instances_for_fieldvalues):
+                        query.update_batch([obj.pk for obj in instances],
+                                           {field.name: value}, self.using)
 
             # reverse instance collections
             for instances in six.itervalues(self.data):
@@ -68,17 +765,57 @@ class LogicalDeleteCollector(Collector):
 
             # delete instances
             for model, instances in six.iteritems(self.data):
-                query = sql.UpdateQuery(model)
-                pk_list = [obj.pk for obj in instances]
-                query.update_batch(pk_list, {'date_removed': date_removed}, self.using)
-                # deleted_counter[model._meta.label] += count
-
-                if not model._meta.auto_created:
-                    for obj in instances:
-                        signals.post_delete.send(
-                            sender=model, instance=obj, using=self.using
+                with self.phase('updates'):
+                    pk_list = [obj.pk for obj in instances]
+                    for offset in range(0, len(pk_list), GET_ITERATOR_CHUNK_SIZE):
+                        count = model._base_manager.using(self.using).filter(
+                            pk__in=pk_list[offset:offset + GET_ITERATOR_CHUNK_SIZE],
+                            date_removed__isnull=date_removed is not None,
+                        ).update(**self.get_update_values(model, date_removed))
+                        deleted_counter[model] += count
+
+                if not model._meta.auto_created and get_options(model).instance_signals:
+                    with self.phase('signals'):
+                        for obj in instances:
+                            signals.post_delete.send(
+                                sender=model, instance=obj, using=self.using
+                            )
+
+            with self.phase('updates'):
+                # keep the active/deleted counters of the changed models
+                for model, count in six.iteritems(deleted_counter):
+                    if count and get_options(model).counters:
+                        from logicaldelete.models import LogicalDeleteCounter
+                        if date_removed is None:
+                            LogicalDeleteCounter.objects.add(model, active=count, deleted=-count, using=self.using)
+                        else:
+                            LogicalDeleteCounter.objects.add(model, active=-count, deleted=count, using=self.using)
+
+                # append the changes to the feed
+                for model, pks in six.iteritems(bulk_pks):
+                    if get_options(model).change_feed:
+                        from logicaldelete.models import LOGICAL_DELETION, LOGICAL_RESTORE, LogicalDeleteEvent
+                        LogicalDeleteEvent.objects.add(
+                            model, pks,
+                            operation=LOGICAL_DELETION if date_removed is not None else LOGICAL_RESTORE,
+                            timestamp=date_removed or now(),
+                            deletion_batch=self.deletion_batch if date_removed is not None else None,
+                            using=self.using,
                         )
 
+            with self.phase('signals'):
+                for model, pks in six.iteritems(bulk_pks):
+                    post_bulk.send(sender=model, pks=pks, date_removed=date_removed, using=self.using)
+
+            # cached counts and querysets of the changed models are stale
+            # once the transaction commits.
+            changed_models = set(self.data) | set(self.pk_updates) | self.trigger_models
+            changed_models.update(qs.model for qs in self.set_updates + self.fast_deletes)
+            transaction.on_commit(
+                lambda: [bump_generation(model) for model in changed_models],
+                using=self.using
+            )
+
         # update collected instances
         for model, instances_for_fieldvalues in six.iteritems(self.field_updates):
             for (field, value), instances in six.iteritems(instances_for_fieldvalues):
@@ -88,13 +825,66 @@ class LogicalDeleteCollector(Collector):
             for instance in instances:
                 setattr(instance, model._meta.pk.attname, None)
 
-        return sum(deleted_counter.values()), dict(deleted_counter)
+        return sum(deleted_counter.values()), {
+            model._meta.label: count for model, count in six.iteritems(deleted_counter)
+        }
 
     def delete(self):
-        return self.delete_undelete(date_removed=now())
+        self.deletion_batch = uuid.uuid4()
+        with transaction.atomic(using=self.using, savepoint=False):
+            result = self.delete_undelete(date_removed=now())
+            with self.phase('archive'):
+                self.archive_deleted()
+        return result
+
+    def archive_deleted(self):
+        """
+        Moves the objects deleted by this collector of the models with
+        ``LogicalDeleteMeta.archive_on_delete`` to their archive tables.
+        """
+        models = set(self.data) | set(self.pk_updates) | set(qs.model for qs in self.set_updates + self.fast_deletes)
+        models = [model for model in models if get_options(model).archive_on_delete]
+        if models:
+            from logicaldelete.archive import archive_all
+            archive_all(models, deletion_batch=self.deletion_batch, using=self.using)
 
     def undelete(self):
         return self.delete_undelete(date_removed=None)
 
     def recover(self):
-        self.undelete()
\ No newline at end of file
+        self.undelete()
+
+
+class LogicalDeleteCompleteCollector(Collector):
+    """
+    Collector for `delete_complete`, keeping the `LogicalDeleteCounter` of the
+    deleted models.
+    """
+
+    def delete(self):
+        from logicaldelete.models import LogicalDeleteCounter
+
+        with transaction.atomic(using=self.using, savepoint=False):
+            deltas = []
+            for model, instances in six.iteritems(self.data):
+                if get_options(model).counters:
+                    active = sum(1 for obj in instances if obj.date_removed is None)
+                    deltas.append((model, -active, active - len(instances)))
+            for qs in self.fast_deletes:
+                if get_options(qs.model).counters:
+                    deltas.append((
+                        qs.model,
+                        -qs.filter(date_removed__isnull=True).count(),
+                        -qs.filter(date_removed__isnull=False).count(),
+                    ))
+
+            changed_models = set(self.data) | set(qs.model for qs in self.fast_deletes)
+            result = super(LogicalDeleteCompleteCollector, self).delete()
+
+            for model, active, deleted in deltas:
+                LogicalDeleteCounter.objects.add(model, active=active, deleted=deleted, using=self.using)
+            transaction.on_commit(
+                lambda: [bump_generation(model) for model in changed_models],
+                using=self.using
+            )
+        return result
@@ -1,25 +1,46 @@
 # coding=utf-8
 from django import forms
+from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
 from django.core.exceptions import ValidationError
 
 
 class LogicalModelForm(forms.ModelForm):
 
+    # Check that unique_together doesn't collide with deleted records. Disable
+    # it when the database unique constraints already ignore deleted records.
+    validate_deleted_unique = True
+
     def clean(self):
 
         cleaned_data = super(LogicalModelForm, self).clean()
 
-        for fields in self._meta.model._meta.unique_together:
-            data = {}
-            for field in fields:
-                data[field] = cleaned_data.get(field)
-
-            data.update({'date_removed__isnull': False})
-
-            if self._meta.model.objects.everything().filter(**data).exclude(id=self.instance.id).exists():
-                fields_text = u', '.join(fields)
-                raise ValidationError(_(u'ya existe un registro con los campos: {0}. en los registros borrados. '
-                                      u'revise los registros borrados y modifique la informacion').format(fields_text))
+        unique_together = self._meta.model._meta.unique_together
+        if not self.validate_deleted_unique or not unique_together:
+            return cleaned_data
+
+        # One query for every constraint, the colliding record tells which
+        # one failed.
+        query = Q()
+        for fields in unique_together:
+            query |= Q(**{field: cleaned_data.get(field) for field in fields})
+
+        all_fields = set(field for fields in unique_together for field in fields)
+        collisions = self._meta.model.objects.everything().filter(query, date_removed__isnull=False).exclude(
+            pk=self.instance.pk).values(*all_fields)[:1]
+
+        for collision in collisions:
+            for fields in unique_together:
+                if all(collision[field] == getattr(cleaned_data.get(field), 'pk', cleaned_data.get(field))
+                       for field in fields):
+                    fields_text = u', '.join(fields)
+                    raise ValidationError(_(u'ya existe un registro con los campos: {0}. en los registros borrados. '
+                                          u'revise los registros borrados y modifique la informacion').format(fields_text))
+            # The database matched a constraint the values above don't, like
+            # with case insensitive collations or converted values.
+            constraints_text = u'; '.join(u', '.join(fields) for fields in unique_together)
+            raise ValidationError(_(u'ya existe un registro en los registros borrados que coincide con alguno de '
+                                    u'los campos: {0}. revise los registros borrados y modifique la '
+                                    u'informacion').format(constraints_text))
 
         return cleaned_data
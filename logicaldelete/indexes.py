@@ -0,0 +1,95 @@
+# coding=utf-8
+from django.db.models import Index
+
+
+class PartialIndex(Index):
+    """
+    An index restricted to the rows matching ``condition``. The condition is
+    rendered against the ``condition_field`` column of the model,
+    ``date_removed`` by default, so it only makes sense on
+    `logicaldelete.models.LogicalModel` subclasses.
+
+    Databases without partial index support get a plain index.
+    """
+
+    condition = None
+    condition_field = 'date_removed'
+    supported_vendors = ('postgresql', 'sqlite')
+
+    def get_condition_sql(self, model, schema_editor):
+        column = model._meta.get_field(self.condition_field).column
+        return self.condition % {'column': schema_editor.quote_name(column)}
+
+    def create_sql(self, model, schema_editor, using=''):
+        sql = super(PartialIndex, self).create_sql(model, schema_editor, using=using)
+        if self.condition and schema_editor.connection.vendor in self.supported_vendors:
+            sql = '%s WHERE %s' % (sql, self.get_condition_sql(model, schema_editor))
+        return sql
+
+
+class ActiveIndex(PartialIndex):
+    """
+    Index over live rows only, backing the ``date_removed IS NULL`` filter
+    added by `LogicalDeletedManager.get_queryset()`. ``date_removed`` is NULL
+    on every row it covers, so index the columns the live rows are looked up
+    or ordered by, the automatic one indexes the primary key.
+    """
+
+    suffix = 'act'
+    condition = '%(column)s IS NULL'
+
+
+class DeletedIndex(PartialIndex):
+    """
+    Index over logically deleted rows only, backing `only_deleted()`.
+    """
+
+    suffix = 'del'
+    condition = '%(column)s IS NOT NULL'
+
+
+class DeletionBatchIndex(PartialIndex):
+    """
+    Index over the ``deletion_batch`` of logically deleted rows, backing the
+    restores of whole batches. Live rows have none, so they're left out and
+    inserts don't pay for it.
+    """
+
+    suffix = 'bat'
+    condition = '%(column)s IS NOT NULL'
+    condition_field = 'deletion_batch'
+
+    def __init__(self, fields=('deletion_batch',), name=None):
+        super(DeletionBatchIndex, self).__init__(fields=list(fields), name=name)
+
+
+class LiveUniqueIndex(PartialIndex):
+    """
+    Unique index over live rows only, logically deleted rows don't block
+    creating new ones with the same values. Databases without partial indexes
+    get a plain, non unique, index, which the ``logicaldelete.E001`` system
+    check reports.
+    """
+
+    suffix = 'unq'
+    condition = '%(column)s IS NULL'
+
+    def create_sql(self, model, schema_editor, using=''):
+        sql = super(LiveUniqueIndex, self).create_sql(model, schema_editor, using=using)
+        if schema_editor.connection.vendor in self.supported_vendors:
+            sql = sql.replace('CREATE INDEX', 'CREATE UNIQUE INDEX', 1)
+        return sql
+
+
+class AsOfIndex(Index):
+    """
+    Composite index over ``(date_removed, date_created)`` backing
+    `LogicalDeleteQuerySet.as_of()`: both branches of its predicate, live rows
+    created before the timestamp and rows deleted after it, are range scans
+    of the index.
+    """
+
+    suffix = 'aso'
+
+    def __init__(self, fields=('date_removed', 'date_created'), name=None):
+        super(AsOfIndex, self).__init__(fields=list(fields), name=name)
@@ -0,0 +1,79 @@
+import datetime
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.timezone import now
+
+from logicaldelete.archive import archive_all, get_archive_queryset
+from logicaldelete.deletion import get_options
+from logicaldelete.models import get_logical_models
+
+
+class Command(BaseCommand):
+    help = ("Moves the logically deleted objects of the models with LogicalDeleteMeta.archive "
+            "to their archive tables, in chunks.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'labels', nargs='*', metavar='app_label.ModelName',
+            help='Only archive these models. Defaults to every model with an archive.',
+        )
+        parser.add_argument(
+            '--older-than', type=int, metavar='DAYS',
+            help='Only archive objects deleted more than DAYS days ago.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of objects moved per transaction.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to sleep between chunks.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true', dest='dry_run',
+            help='Only report how many objects can be archived now.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Nominates a database to archive. Defaults to the "default" database.',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        older_than = None
+        if options['older_than'] is not None:
+            older_than = now() - datetime.timedelta(days=options['older_than'])
+
+        if options['labels']:
+            try:
+                models = [apps.get_model(label) for label in options['labels']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+            for model in models:
+                if not get_options(model).archive:
+                    raise CommandError('%s has no archive table.' % model._meta.label)
+        else:
+            models = [model for model in get_logical_models() if get_options(model).archive]
+
+        if options['dry_run']:
+            for model in models:
+                count = get_archive_queryset(model, older_than=older_than, using=options['database']).count()
+                self.stdout.write('%s: %d objects to archive' % (model._meta.label, count))
+            return
+
+        moved = archive_all(
+            models,
+            older_than=older_than,
+            chunk_size=options['chunk_size'],
+            sleep=options['sleep'],
+            using=options['database'],
+            progress=self.report_progress,
+        )
+        for label, count in sorted(moved.items()):
+            self.stdout.write('%s: %d objects archived' % (label, count))
+
+    def report_progress(self, model, moved):
+        if self.verbosity > 1:
+            self.stdout.write('%s: %d objects archived' % (model._meta.label, moved))
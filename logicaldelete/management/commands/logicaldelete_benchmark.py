@@ -0,0 +1,80 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from logicaldelete.benchmark import OPERATIONS, run_benchmark
+
+
+class Command(BaseCommand):
+    help = ("Measures the wall time, queries and peak memory of deletes, undeletes and purges "
+            "over a synthetic model graph, and prints the results as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'operations', nargs='*', metavar='operation',
+            help='Only run these operations, among %s. Defaults to all.' % ', '.join(OPERATIONS),
+        )
+        parser.add_argument(
+            '--depth', type=int, default=3,
+            help='Number of models in the cascade chain.',
+        )
+        parser.add_argument(
+            '--fan-out', type=int, default=5,
+            help='Number of children of every object.',
+        )
+        parser.add_argument(
+            '--roots', type=int, default=100,
+            help='Number of objects of the first model.',
+        )
+        parser.add_argument(
+            '--deleted-ratio', type=float, default=0.1,
+            help='Ratio of objects logically deleted beforehand.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=1,
+            help='Number of runs of every operation.',
+        )
+        parser.add_argument(
+            '--no-memory', action='store_false', dest='memory',
+            help="Don't trace the peak memory, which slows the operations down.",
+        )
+        parser.add_argument(
+            '--output', metavar='FILE',
+            help='Write the results to FILE instead of the standard output.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Nominates a database to run the benchmark on. Defaults to the "default" database.',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        operations = options['operations'] or OPERATIONS
+        for operation in operations:
+            if operation not in OPERATIONS:
+                raise CommandError('Unknown operation %r.' % operation)
+        if options['depth'] < 1:
+            raise CommandError('--depth must be at least 1.')
+
+        results = run_benchmark(
+            depth=options['depth'],
+            fan_out=options['fan_out'],
+            roots=options['roots'],
+            deleted_ratio=options['deleted_ratio'],
+            operations=operations,
+            repeat=options['repeat'],
+            memory=options['memory'],
+            using=options['database'],
+            progress=self.report_progress,
+        )
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+    def report_progress(self, operation, result):
+        if self.verbosity > 1:
+            self.stderr.write('%s: %.3fs, %d queries' % (operation, result['wall_time'], result['queries']))
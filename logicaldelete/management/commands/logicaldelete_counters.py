@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from logicaldelete.deletion import get_options
+from logicaldelete.models import LogicalDeleteCounter, get_logical_models
+
+
+class Command(BaseCommand):
+    help = "Recomputes the active/deleted counters of the models with LogicalDeleteMeta.counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'labels', nargs='*', metavar='app_label.ModelName',
+            help='Only repair these models.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Nominates a database to repair. Defaults to the "default" database.',
+        )
+
+    def handle(self, *labels, **options):
+        labels = set(label.lower() for label in options['labels'])
+        for model in get_logical_models():
+            if labels and model._meta.label_lower not in labels:
+                continue
+            if not labels and not get_options(model).counters:
+                continue
+
+            counter = LogicalDeleteCounter.objects.repair(model, using=options['database'])
+            self.stdout.write('%s: %d active, %d deleted' % (model._meta.label, counter.active, counter.deleted))
@@ -0,0 +1,87 @@
+import datetime
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.timezone import now
+
+from logicaldelete.deletion import get_options
+from logicaldelete.models import get_logical_models
+from logicaldelete.purge import get_purge_queryset, purge
+
+
+class Command(BaseCommand):
+    help = ("Deletes completely the objects logically deleted longer than their "
+            "LogicalDeleteMeta.retention ago, in chunks.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'labels', nargs='*', metavar='app_label.ModelName',
+            help='Only purge these models. Defaults to every model with a retention.',
+        )
+        parser.add_argument(
+            '--older-than', type=int, metavar='DAYS',
+            help='Purge objects deleted more than DAYS days ago instead of using the model retention.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of objects deleted per transaction.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to sleep between chunks.',
+        )
+        parser.add_argument(
+            '--start-after', metavar='PK',
+            help='Resume after this primary key, only with a single model.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true', dest='dry_run',
+            help='Only report how many objects would be purged.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Nominates a database to purge. Defaults to the "default" database.',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        older_than = None
+        if options['older_than'] is not None:
+            older_than = now() - datetime.timedelta(days=options['older_than'])
+
+        if options['labels']:
+            try:
+                models = [apps.get_model(label) for label in options['labels']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+        else:
+            models = get_logical_models()
+            if older_than is None:
+                models = [model for model in models if get_options(model).retention is not None]
+
+        if options['start_after'] is not None and len(models) != 1:
+            raise CommandError('--start-after requires a single model.')
+
+        for model in models:
+            if options['dry_run']:
+                count = get_purge_queryset(model, older_than=older_than, using=options['database']).count()
+                self.stdout.write('%s: %d objects to purge' % (model._meta.label, count))
+                continue
+
+            deleted, rows_count = purge(
+                model,
+                older_than=older_than,
+                chunk_size=options['chunk_size'],
+                sleep=options['sleep'],
+                start_after=options['start_after'],
+                using=options['database'],
+                progress=self.report_progress,
+            )
+            self.stdout.write('%s: %d objects purged (%s)' % (
+                model._meta.label, deleted,
+                ', '.join('%s: %d' % item for item in sorted(rows_count.items()))))
+
+    def report_progress(self, model, last_pk, deleted):
+        if self.verbosity > 1:
+            self.stdout.write('%s: %d objects purged, last pk %s' % (model._meta.label, deleted, last_pk))
@@ -0,0 +1,83 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+
+from logicaldelete.restore import restore_window
+
+
+class Command(BaseCommand):
+    help = ("Restores every object logically deleted in a time window, with one UPDATE per table "
+            "run on a pool of threads.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'labels', nargs='*', metavar='app_label.ModelName',
+            help='Only restore these models. Defaults to every LogicalModel.',
+        )
+        parser.add_argument(
+            '--since', required=True, metavar='DATETIME',
+            help='Restore objects deleted at or after DATETIME, like "2017-06-01 14:30".',
+        )
+        parser.add_argument(
+            '--until', metavar='DATETIME',
+            help='Restore objects deleted before DATETIME. Defaults to now.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Number of tables restored at the same time.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true', dest='dry_run',
+            help='Only report how many objects would be restored.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Nominates a database to restore. Defaults to the "default" database.',
+        )
+
+    def parse_datetime(self, value):
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise CommandError('%r is not a valid date and time.' % value)
+        if settings.USE_TZ and is_naive(parsed):
+            parsed = make_aware(parsed)
+        return parsed
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        since = self.parse_datetime(options['since'])
+        until = self.parse_datetime(options['until']) if options['until'] else now()
+        if since >= until:
+            raise CommandError('--since must be before --until.')
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1.')
+
+        models = None
+        if options['labels']:
+            try:
+                models = [apps.get_model(label) for label in options['labels']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+
+        results = restore_window(
+            since, until,
+            models=models,
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+            using=options['database'],
+            progress=self.report_progress,
+        )
+        verb = 'to restore' if options['dry_run'] else 'restored'
+        for label, count in sorted(results.items()):
+            if count or self.verbosity > 1:
+                self.stdout.write('%s: %d objects %s' % (label, count, verb))
+
+    def report_progress(self, model, count):
+        if self.verbosity > 2:
+            self.stdout.write('%s: done' % model._meta.label)
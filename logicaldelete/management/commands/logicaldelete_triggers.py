@@ -0,0 +1,64 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from logicaldelete.models import get_logical_models
+from logicaldelete.triggers import (
+    get_create_sql, get_drop_sql, get_trigger_relations, supported_vendors,
+)
+
+
+class Command(BaseCommand):
+    help = ("Installs database triggers cascading soft deletes and restores along the CASCADE "
+            "relations between logical models.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'labels', nargs='*', metavar='app_label.ModelName',
+            help='Only the relations from these models. Defaults to every logical model.',
+        )
+        parser.add_argument(
+            '--drop', action='store_true', dest='drop',
+            help='Drop the triggers instead of installing them.',
+        )
+        parser.add_argument(
+            '--sql', action='store_true', dest='sql',
+            help='Only print the SQL statements.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Nominates a database. Defaults to the "default" database.',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor not in supported_vendors:
+            raise CommandError('Triggers are not supported on %s.' % connection.vendor)
+
+        if options['labels']:
+            try:
+                models = [apps.get_model(label) for label in options['labels']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+        else:
+            models = get_logical_models()
+
+        relations = get_trigger_relations(models)
+        statements = []
+        for related in relations:
+            statements.extend(get_drop_sql(related, connection))
+            if not options['drop']:
+                statements.extend(get_create_sql(related, connection))
+
+        if options['sql']:
+            for statement in statements:
+                self.stdout.write('%s;' % statement)
+            return
+
+        with transaction.atomic(using=options['database']):
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+        self.stdout.write('%s the triggers of %d relations.' % (
+            'Dropped' if options['drop'] else 'Installed', len(relations)))
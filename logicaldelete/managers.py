@@ -1,6 +1,13 @@
+import datetime
+
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import F
 from django.db.models.manager import BaseManager
+from django.utils.encoding import force_text
+from django.utils.timezone import now
 
+from logicaldelete.deletion import get_options
 from logicaldelete.query import LogicalDeleteQuerySet
 
 
@@ -17,12 +24,9 @@ class LogicalDeletedManager(BaseManager.from_queryset(LogicalDeleteQuerySet)):
 
         if self.model:
             qs = LogicalDeleteQuerySet(self.model, using=self._db, hints=self._hints).all()
-            qs = qs.filter(date_removed__isnull=True)
-
-            if hasattr(self, 'core_filters') and self.core_filters is not None:
-                return qs.filter(**self.core_filters)
-
-            return qs
+            # Related managers add their filters themselves, leaving them
+            # out of the querysets of prefetch_related().
+            return qs.filter(date_removed__isnull=True)
     
     def only_deleted(self):
         if self.model:
@@ -30,6 +34,7 @@ class LogicalDeletedManager(BaseManager.from_queryset(LogicalDeleteQuerySet)):
                 date_removed__isnull=False
             )
             qs.__class__ = LogicalDeleteQuerySet
+            qs._with_archive = get_options(self.model).archive
             return qs
 
     def get(self, *args, **kwargs):
@@ -47,7 +52,9 @@ class LogicalDeletedManager(BaseManager.from_queryset(LogicalDeleteQuerySet)):
         return self.get_queryset().filter(*args, **kwargs)
 
     def all(self):
-        return self.get_queryset().all()
+        # Like Manager.all(), return get_queryset() as is, related managers
+        # return the objects of prefetch_related() from it.
+        return self.get_queryset()
 
     def all_with_deleted(self):
         return self.everything()
@@ -62,4 +69,125 @@ class LogicalDeletedManager(BaseManager.from_queryset(LogicalDeleteQuerySet)):
         # for related manager
         # if hasattr(self, 'core_filters'):
         #     return qs.filter(**self.core_filters)
+        qs._with_archive = get_options(self.model).archive
         return qs
+
+    def as_of(self, timestamp):
+        """
+        Returns the objects that were live at ``timestamp``, see
+        `LogicalDeleteQuerySet.as_of`. Works on related managers too.
+        """
+        return self.everything().as_of(timestamp)
+
+    def aeverything(self):
+        """
+        everything() to iterate with ``async for``.
+        """
+        return self.everything()
+
+    def aonly_deleted(self):
+        """
+        only_deleted() to iterate with ``async for``.
+        """
+        return self.only_deleted()
+
+    def counts(self):
+        """
+        Returns the number of active and deleted objects of the model from its
+        `LogicalDeleteCounter`, see ``LogicalDeleteMeta.counters``.
+        """
+        from logicaldelete.models import LogicalDeleteCounter
+        active, deleted = LogicalDeleteCounter.objects.get_counts(self.model, using=self.db)
+        return {'active': active, 'deleted': deleted}
+
+
+class LogicalDeleteCounterManager(models.Manager):
+
+    def add(self, model, active=0, deleted=0, using=None):
+        """
+        Adds ``active`` and ``deleted`` to the counters of ``model``, which
+        are computed from scratch the first time.
+        """
+        content_type = ContentType.objects.db_manager(using).get_for_model(model)
+        updated = self.db_manager(using).filter(content_type=content_type).update(
+            active=F('active') + active,
+            deleted=F('deleted') + deleted,
+        )
+        if not updated:
+            self.repair(model, using=using)
+
+    def repair(self, model, using=None):
+        """
+        Recomputes the counters of ``model`` counting its rows.
+        """
+        objects = model._base_manager.db_manager(using).all()
+        deleted = objects.filter(date_removed__isnull=False).count()
+        archive_model = get_options(model).archive_model
+        if archive_model is not None:
+            deleted += archive_model._base_manager.db_manager(using).count()
+
+        content_type = ContentType.objects.db_manager(using).get_for_model(model)
+        counter, created = self.db_manager(using).update_or_create(
+            content_type=content_type,
+            defaults={
+                'active': objects.filter(date_removed__isnull=True).count(),
+                'deleted': deleted,
+            }
+        )
+        return counter
+
+    def get_counts(self, model, using=None):
+        """
+        Returns the (active, deleted) counters of ``model``.
+        """
+        content_type = ContentType.objects.db_manager(using).get_for_model(model)
+        try:
+            counter = self.db_manager(using).get(content_type=content_type)
+        except self.model.DoesNotExist:
+            counter = self.repair(model, using=using)
+        return counter.active, counter.deleted
+
+
+class LogicalDeleteEventManager(models.Manager):
+
+    def add(self, model, pks, operation, timestamp, deletion_batch=None, using=None):
+        """
+        Appends an ``operation`` event per primary key of ``pks`` of ``model``.
+        """
+        label = model._meta.concrete_model._meta.label
+        self.db_manager(using).bulk_create([
+            self.model(model=label, object_pk=force_text(pk), operation=operation, timestamp=timestamp,
+                       deletion_batch=deletion_batch)
+            for pk in pks
+        ], batch_size=1000)
+
+    def read(self, after=0, limit=1000, models=None, lag=None, using=None):
+        """
+        Returns up to ``limit`` events after the ``after`` cursor, the primary
+        key of the last event read, in cursor order, optionally only of
+        ``models``.
+
+        Cursors are allocated when events are written, and concurrent
+        transactions may commit them out of order. With ``lag`` seconds, the
+        events more recent than that are left for later reads, so events
+        committed late by transactions shorter than it aren't skipped.
+        """
+        events = self.db_manager(using).filter(pk__gt=after).order_by('pk')
+        if models is not None:
+            events = events.filter(model__in=[model._meta.concrete_model._meta.label for model in models])
+        if lag:
+            events = events.filter(timestamp__lte=now() - datetime.timedelta(seconds=lag))
+        return list(events[:limit])
+
+    def pages(self, after=0, page_size=1000, **kwargs):
+        """
+        Yields lists of at most ``page_size`` events after the ``after``
+        cursor until there are no more, see `read`. Store the primary key of
+        the last event of every page processed to resume from it.
+        """
+        while True:
+            events = self.read(after=after, limit=page_size, **kwargs)
+            if not events:
+                return
+            yield events
+            after = events[-1].pk
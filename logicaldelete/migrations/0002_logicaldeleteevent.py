@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 19:39
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logicaldelete', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogicalDeleteEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=255)),
+                ('object_pk', models.CharField(max_length=255)),
+                ('operation', models.PositiveSmallIntegerField(choices=[(4, 'Delete'), (5, 'Restore')])),
+                ('timestamp', models.DateTimeField()),
+                ('deletion_batch', models.UUIDField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='logicaldeleteevent',
+            index=models.Index(fields=['model', 'id'], name='logicaldele_model_44f650_idx'),
+        ),
+    ]
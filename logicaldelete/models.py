@@ -1,9 +1,16 @@
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
 from django.db import models, router
-from django.db.models.deletion import Collector
+from django.db.models.signals import class_prepared, post_save
 from django.utils import timezone
+from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 
-from logicaldelete.deletion import LogicalDeleteCollector
+from logicaldelete.archive import create_archive_model, unarchive
+from logicaldelete.deletion import (
+    LogicalDeleteCollector, LogicalDeleteCompleteCollector, LogicalDeleteOptions, run_with_retries,
+)
+from logicaldelete.indexes import ActiveIndex, AsOfIndex, DeletedIndex, DeletionBatchIndex, LiveUniqueIndex
 from logicaldelete import managers
 
 LOGICAL_DELETION = 4
@@ -14,11 +21,17 @@ class LogicalModel(models.Model):
     """
     This base model provides date fields and functionality to enable logical
     delete functionality in derived models.
+
+    Derived models can tune the behaviour declaring an inner
+    ``LogicalDeleteMeta`` class, see `LogicalDeleteOptions`.
     """
     
     date_created = models.DateTimeField(default=timezone.now)
     date_modified = models.DateTimeField(default=timezone.now)
     date_removed = models.DateTimeField(null=True, blank=True)
+    # Identifies the delete operation that removed the object, see
+    # `LogicalDeleteCollector.collect_batches`.
+    deletion_batch = models.UUIDField(null=True, blank=True, editable=False)
     
     objects = managers.LogicalDeletedManager()
     #TODO: Create undelete permissions to all models
@@ -29,16 +42,13 @@ class LogicalModel(models.Model):
     active.boolean = True
     active.short_description = _('Active')
 
-    def delete(self, using=None, keep_parents=False):
+    def delete(self, using=None, keep_parents=False, stats=None, locking=None):
         using = using or router.db_for_write(self.__class__, instance=self)
         assert self._get_pk_val() is not None, (
             "%s object can't be deleted because its %s attribute is set to None." %
             (self._meta.object_name, self._meta.pk.attname)
         )
-
-        collector = LogicalDeleteCollector(using=using)
-        collector.collect([self], keep_parents=keep_parents)
-        return collector.delete()
+        return self._run_collector('delete', using, keep_parents, stats, locking)
 
     delete.alters_data = True
 
@@ -49,24 +59,193 @@ class LogicalModel(models.Model):
             (self._meta.object_name, self._meta.pk.attname)
         )
 
-        collector = Collector(using=using)
+        unarchive(self.__class__._base_manager.using(using).filter(pk=self.pk))
+        collector = LogicalDeleteCompleteCollector(using=using)
         collector.collect([self], keep_parents=keep_parents)
         return collector.delete()
 
     delete_complete.alters_data = True
 
-    def undelete(self, using=None, keep_parents=False):
+    def undelete(self, using=None, keep_parents=False, stats=None, locking=None):
         using = using or router.db_for_write(self.__class__, instance=self)
         assert self._get_pk_val() is not None, (
             "%s object can't be deleted because its %s attribute is set to None." %
             (self._meta.object_name, self._meta.pk.attname)
         )
-
-        collector = LogicalDeleteCollector(using=using)
-        collector.collect([self], keep_parents=keep_parents)
-        return collector.undelete()
+        unarchive(self.__class__._base_manager.using(using).filter(pk=self.pk))
+        return self._run_collector('undelete', using, keep_parents, stats, locking)
 
     undelete.alters_data = True
 
+    def adelete(self, *args, **kwargs):
+        """
+        Async delete(), see `logicaldelete.aio`.
+        """
+        from logicaldelete.aio import run_sync
+        return run_sync(self.delete, *args, **kwargs)
+
+    adelete.alters_data = True
+
+    def adelete_complete(self, *args, **kwargs):
+        """
+        Async delete_complete(), see `logicaldelete.aio`.
+        """
+        from logicaldelete.aio import run_sync
+        return run_sync(self.delete_complete, *args, **kwargs)
+
+    adelete_complete.alters_data = True
+
+    def aundelete(self, *args, **kwargs):
+        """
+        Async undelete(), see `logicaldelete.aio`.
+        """
+        from logicaldelete.aio import run_sync
+        return run_sync(self.undelete, *args, **kwargs)
+
+    aundelete.alters_data = True
+
+    def _run_collector(self, method, using, keep_parents, stats, locking):
+        # Same as LogicalDeleteQuerySet._run_collector() for this object.
+        options = self._logicaldelete
+        if locking is None:
+            locking = options.locking
+
+        def run():
+            collector = LogicalDeleteCollector(using=using, stats=stats, locking=locking)
+            if method == 'undelete':
+                collector.collect_undelete([self], keep_parents=keep_parents)
+            else:
+                collector.collect([self], keep_parents=keep_parents)
+            return getattr(collector, method)()
+
+        retries = options.lock_retries if locking else 0
+        return run_with_retries(run, using, retries, options.lock_retry_delay)
+
+    def _get_unique_checks(self, exclude=None):
+        unique_checks, date_checks = super(LogicalModel, self)._get_unique_checks(exclude=exclude)
+        # validate_unique() checks them against the default manager, so only
+        # live rows collide.
+        for fields in self._logicaldelete.unique_live:
+            if not exclude or not any(name in exclude for name in fields):
+                unique_checks.append((self.__class__, fields))
+        return unique_checks, date_checks
+
     class Meta:
         abstract = True
+
+
+@python_2_unicode_compatible
+class LogicalDeleteCounter(models.Model):
+    """
+    Number of active and logically deleted objects of a `LogicalModel` with
+    ``LogicalDeleteMeta.counters``, updated on every create, delete, undelete
+    and delete_complete.
+    """
+
+    content_type = models.OneToOneField(ContentType, on_delete=models.CASCADE)
+    active = models.BigIntegerField(default=0)
+    deleted = models.BigIntegerField(default=0)
+
+    objects = managers.LogicalDeleteCounterManager()
+
+    def __str__(self):
+        return '%s: %d/%d' % (self.content_type, self.active, self.deleted)
+
+
+@python_2_unicode_compatible
+class LogicalDeleteEvent(models.Model):
+    """
+    Append only feed of the objects deleted and restored by the collectors,
+    of the models with ``LogicalDeleteMeta.change_feed``, written in the same
+    transaction. The primary key is the cursor of the consumers, see
+    `LogicalDeleteEventManager.read`.
+    """
+
+    OPERATION_CHOICES = (
+        (LOGICAL_DELETION, _('Delete')),
+        (LOGICAL_RESTORE, _('Restore')),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=255)
+    object_pk = models.CharField(max_length=255)
+    operation = models.PositiveSmallIntegerField(choices=OPERATION_CHOICES)
+    timestamp = models.DateTimeField()
+    deletion_batch = models.UUIDField(null=True, blank=True)
+
+    objects = managers.LogicalDeleteEventManager()
+
+    class Meta:
+        indexes = [models.Index(fields=['model', 'id'])]
+
+    def __str__(self):
+        return '%s %s.%s' % (self.get_operation_display(), self.model, self.object_pk)
+
+
+def get_logical_models(include_proxy=False):
+    """
+    Returns every installed concrete model that inherits from `LogicalModel`.
+    """
+    return [
+        model for model in apps.get_models()
+        if issubclass(model, LogicalModel) and (include_proxy or not model._meta.proxy)
+    ]
+
+
+def count_created(sender, instance, created, using=None, **kwargs):
+    if created:
+        if instance.date_removed is None:
+            LogicalDeleteCounter.objects.add(sender, active=1, using=using)
+        else:
+            LogicalDeleteCounter.objects.add(sender, deleted=1, using=using)
+
+
+def prepare_logical_model(sender, **kwargs):
+    if not issubclass(sender, LogicalModel):
+        return
+
+    sender._logicaldelete = options = LogicalDeleteOptions(getattr(sender, 'LogicalDeleteMeta', None))
+    if options.counters:
+        post_save.connect(count_created, sender=sender)
+
+    if sender._meta.proxy:
+        concrete_options = sender._meta.concrete_model._logicaldelete
+        options.unique_live = concrete_options.unique_live
+        options.archive = concrete_options.archive
+        options.archive_model = concrete_options.archive_model
+        return
+
+    if options.archive or options.archive_on_delete:
+        options.archive = True
+        options.archive_model = create_archive_model(sender)
+
+    if options.unique_live is True:
+        options.unique_live = sender._meta.unique_together
+        sender._meta.unique_together = ()
+        if 'unique_together' in sender._meta.original_attrs:
+            sender._meta.original_attrs['unique_together'] = ()
+    options.unique_live = tuple(tuple(fields) for fields in options.unique_live)
+
+    indexes = [LiveUniqueIndex(fields=list(fields)) for fields in options.unique_live]
+    if sender._meta.get_field('deletion_batch').model is sender:
+        indexes.append(DeletionBatchIndex())
+    if options.partial_indexes:
+        # date_removed is NULL on every live row, index the primary key
+        # instead, unless the model declares its own live rows index.
+        if not any(isinstance(index, ActiveIndex) for index in sender._meta.indexes):
+            indexes.append(ActiveIndex(fields=[sender._meta.pk.name]))
+        indexes.append(DeletedIndex(fields=['date_removed']))
+    if options.as_of_index:
+        indexes.append(AsOfIndex())
+
+    for index in indexes:
+        if any(type(other) is type(index) and other.fields == index.fields for other in sender._meta.indexes):
+            continue
+        index.set_name_with_model(sender)
+        sender._meta.indexes.append(index)
+    # Migrations only pick up the indexes declared in Meta.
+    sender._meta.original_attrs['indexes'] = sender._meta.indexes
+
+
+class_prepared.connect(prepare_logical_model)
+
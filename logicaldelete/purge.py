@@ -0,0 +1,97 @@
+# coding=utf-8
+import datetime
+import time
+from collections import Counter
+
+from django.db import router, transaction
+from django.db.models.sql import DeleteQuery
+from django.utils.timezone import now
+
+from logicaldelete.deletion import LogicalDeleteCompleteCollector, get_options
+from logicaldelete.query import pk_batches
+
+
+def get_retention_cutoff(model):
+    """
+    Returns the date before which deleted objects of ``model`` are purged,
+    or None if the model keeps them forever.
+    """
+    retention = get_options(model).retention
+    if retention is None:
+        return None
+    if not isinstance(retention, datetime.timedelta):
+        retention = datetime.timedelta(days=retention)
+    return now() - retention
+
+
+def get_purge_queryset(model, older_than=None, using=None):
+    """
+    Returns the objects of ``model`` deleted before ``older_than``, by default
+    the retention cutoff of the model.
+    """
+    if older_than is None:
+        older_than = get_retention_cutoff(model)
+    if older_than is None:
+        return model._base_manager.none()
+    using = using or router.db_for_write(model)
+    return model._base_manager.using(using).filter(date_removed__lt=older_than)
+
+
+def purge(model, older_than=None, chunk_size=1000, sleep=0, start_after=None, using=None, progress=None):
+    """
+    Deletes completely the objects of ``model`` logically deleted before
+    ``older_than``, by default the ``LogicalDeleteMeta.retention`` cutoff.
+
+    Objects are deleted in primary key order, ``chunk_size`` at a time, each
+    chunk with its related objects in its own transaction, sleeping ``sleep``
+    seconds between chunks. Archived objects are deleted afterwards, see
+    ``LogicalDeleteMeta.archive``. ``progress`` is called with the model, the last
+    primary key of every committed chunk and the number of objects deleted
+    so far, pass the primary key back as ``start_after`` to resume.
+
+    Returns the number of deleted objects and a dictionary with the number of
+    deletions per model label, like `QuerySet.delete()`.
+    """
+    if older_than is None:
+        older_than = get_retention_cutoff(model)
+    queryset = get_purge_queryset(model, older_than=older_than, using=using)
+    deleted, rows_count = 0, Counter()
+
+    for i, pks in enumerate(pk_batches(queryset, chunk_size, start_after)):
+        if i and sleep:
+            time.sleep(sleep)
+
+        collector = LogicalDeleteCompleteCollector(using=queryset.db)
+        collector.collect(model._base_manager.using(queryset.db).filter(pk__in=pks))
+        chunk_deleted, chunk_rows_count = collector.delete()
+
+        deleted += chunk_deleted
+        rows_count.update(chunk_rows_count)
+        if progress is not None:
+            progress(model, pks[-1], deleted)
+
+    archive_model = get_options(model).archive_model
+    if archive_model is not None and older_than is not None:
+        archived = archive_model._base_manager.using(queryset.db).filter(date_removed__lt=older_than)
+        for pks in pk_batches(archived, chunk_size):
+            with transaction.atomic(using=queryset.db):
+                DeleteQuery(archive_model).delete_batch(pks, queryset.db)
+                if get_options(model).counters:
+                    from logicaldelete.models import LogicalDeleteCounter
+                    LogicalDeleteCounter.objects.add(model, deleted=-len(pks), using=queryset.db)
+            deleted += len(pks)
+            rows_count[archive_model._meta.label] += len(pks)
+
+    return deleted, dict(rows_count)
+
+
+def purge_all(models=None, **kwargs):
+    """
+    Runs `purge` for ``models``, by default every `LogicalModel` with
+    ``LogicalDeleteMeta.retention``. Returns the results per model label.
+    """
+    from logicaldelete.models import get_logical_models
+
+    if models is None:
+        models = [model for model in get_logical_models() if get_options(model).retention is not None]
+    return {model._meta.label: purge(model, **kwargs) for model in models}
@@ -1,15 +1,339 @@
 # coding=utf-8
-from django.db.models.deletion import Collector
-from django.db.models.query import QuerySet
+import time
+from collections import Counter
 
-from logicaldelete.deletion import LogicalDeleteCollector
+from django.db.models import Q
+from django.db.models.lookups import IsNull
+from django.db.models.query import Prefetch, QuerySet
+from django.db.models.sql import Query
+from django.db.models.sql.datastructures import Join
+from django.db.models.sql.where import AND
+
+from logicaldelete.archive import archive_queryset, unarchive, union_queryset
+from logicaldelete.cache import get_cache, get_queryset_key
+from logicaldelete.counts import get_count
+from logicaldelete.deletion import (
+    LogicalDeleteCollector, LogicalDeleteCompleteCollector, get_options, run_with_retries,
+)
+
+
+def pk_batches(queryset, batch_size, start_after=None):
+    """
+    Yields lists of at most ``batch_size`` primary keys of ``queryset`` in
+    ascending order, starting after the ``start_after`` primary key. Each batch
+    is fetched once the previous one was consumed, so rows changed meanwhile
+    are not skipped nor fetched twice.
+    """
+    queryset = queryset.order_by('pk')
+    while True:
+        batch_query = queryset if start_after is None else queryset.filter(pk__gt=start_after)
+        pks = list(batch_query.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        yield pks
+        start_after = pks[-1]
+
+
+def get_relation(model, name):
+    """
+    Returns the relation of ``model`` reached through the ``name`` accessor,
+    or None.
+    """
+    for field in model._meta.get_fields():
+        if not field.is_relation:
+            continue
+        accessor = field.get_accessor_name() if field.auto_created and not field.concrete else field.name
+        if accessor == name:
+            return field
+    return None
+
+
+def is_logical_model(model):
+    """
+    Returns whether ``model`` is a `LogicalModel` whose default manager
+    leaves out the deleted objects.
+    """
+    from logicaldelete.managers import LogicalDeletedManager
+
+    return model is not None and isinstance(model._default_manager, LogicalDeletedManager)
+
+
+def restrict_lookups(model, lookups, get_queryset, to_many_only=False):
+    """
+    Returns ``lookups`` of `prefetch_related()` on ``model`` with the
+    relations to `LogicalModel` objects, intermediate ones included, fetched
+    with ``get_queryset(manager)`` of their default manager. With
+    ``to_many_only``, single related objects are left alone. Lookups with
+    their own queryset are left alone.
+    """
+    result, seen = [], set()
+    for lookup in lookups:
+        if isinstance(lookup, Prefetch) and lookup.queryset is not None:
+            result.append(lookup)
+            continue
+        to_attr = lookup.to_attr if isinstance(lookup, Prefetch) else None
+        path = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+        names = path.split('__')
+        current = model
+        for i, name in enumerate(names):
+            relation = get_relation(current, name) if current is not None else None
+            related_model = relation.related_model if relation is not None else None
+            through = '__'.join(names[:i + 1])
+            last = i == len(names) - 1
+            if (relation is not None and is_logical_model(related_model) and
+                    (relation.one_to_many or relation.many_to_many or not to_many_only)):
+                queryset = get_queryset(related_model._default_manager)
+                prefetch = Prefetch(through, queryset, to_attr=to_attr if last else None)
+                if prefetch.prefetch_to not in seen:
+                    seen.add(prefetch.prefetch_to)
+                    result.append(prefetch)
+            elif last:
+                result.append(lookup)
+            current = related_model
+    return result
+
+
+def is_live_join(join_field):
+    """
+    Returns whether the joins through ``join_field`` of a query, a field or a
+    reverse relation, can leave out the deleted objects: joins to the tables
+    holding the ``date_removed`` column of `LogicalModel` objects, other than
+    multi-table inheritance parents.
+    """
+    model = join_field.related_model
+    if isinstance(join_field, LiveJoinField) or not is_logical_model(model):
+        return False
+    field = getattr(join_field, 'field', join_field)
+    return (not field.remote_field.parent_link and
+            model._meta.get_field('date_removed').model is model._meta.concrete_model)
+
+
+class LiveJoinField(object):
+    """
+    Wraps the ``join_field`` of a join to `LogicalModel` objects, adding
+    ``date_removed IS NULL`` to the ON clause of the join, see
+    `LogicalDeleteQuerySet.live_related`.
+    """
+
+    def __init__(self, join_field):
+        self.join_field = join_field
+
+    def __getattr__(self, name):
+        if name == 'join_field':
+            # unpickling
+            raise AttributeError(name)
+        return getattr(self.join_field, name)
+
+    def __eq__(self, other):
+        return self.join_field == getattr(other, 'join_field', other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.join_field)
+
+    def get_extra_restriction(self, where_class, alias, related_alias):
+        model = self.join_field.related_model
+        live = IsNull(model._meta.get_field('date_removed').get_col(alias), True)
+        condition = self.join_field.get_extra_restriction(where_class, alias, related_alias)
+        if condition is None:
+            return live
+        where = where_class()
+        where.add(condition, AND)
+        where.add(live, AND)
+        return where
+
+
+class LiveRelatedQuery(Query):
+    """
+    Query leaving the deleted `LogicalModel` objects out of its joins, see
+    `LogicalDeleteQuerySet.live_related`.
+    """
+
+    def join(self, join, reuse=None):
+        if isinstance(join, Join) and is_live_join(join.join_field):
+            join.join_field = LiveJoinField(join.join_field)
+        return super(LiveRelatedQuery, self).join(join, reuse=reuse)
 
 
 class LogicalDeleteQuerySet(QuerySet):
 
-    def delete(self):
+    # (strategy, options) used by count(), see with_count_strategy().
+    _count_strategy = None
+    # Read the archive table too, set by everything() and only_deleted() of
+    # models with ``LogicalDeleteMeta.archive``.
+    _with_archive = False
+    # Seconds the results are cached, see cached().
+    _cache_timeout = None
+    # Point in time of as_of(), applied to the prefetched relations too.
+    _as_of = None
+
+    def _clone(self, **kwargs):
+        kwargs.setdefault('_count_strategy', self._count_strategy)
+        kwargs.setdefault('_with_archive', self._with_archive)
+        kwargs.setdefault('_cache_timeout', self._cache_timeout)
+        kwargs.setdefault('_as_of', self._as_of)
+        return super(LogicalDeleteQuerySet, self)._clone(**kwargs)
+
+    def as_of(self, timestamp):
+        """
+        Returns the objects that were live at ``timestamp``: created at or
+        before it and not deleted, or deleted after it. Call it on querysets
+        including deleted objects, like everything(), see
+        `LogicalDeletedManager.as_of`. Relations prefetched with
+        `prefetch_related()` are restricted to ``timestamp`` too.
+        """
+        return self.filter(
+            Q(date_removed__isnull=True) | Q(date_removed__gt=timestamp),
+            date_created__lte=timestamp,
+        )._clone(_as_of=timestamp)
+
+    def live_related(self):
+        """
+        Returns a copy of the QuerySet leaving the deleted `LogicalModel`
+        objects out of its joins, like the ones of `select_related()` and
+        filters across relations: ``date_removed IS NULL`` is added to their
+        ON clause. Objects reached through a nullable relation to a deleted
+        object get None, through a non nullable one they are left out.
+        Relations prefetched with `prefetch_related()` leave them out too,
+        single related objects included.
+        """
+        clone = self._clone()
+        clone.query.__class__ = LiveRelatedQuery
+        for alias, join in list(clone.query.alias_map.items()):
+            if isinstance(join, Join) and is_live_join(join.join_field):
+                join = join.relabeled_clone({})
+                join.join_field = LiveJoinField(join.join_field)
+                clone.query.alias_map[alias] = join
+        return clone
+
+    def _prefetch_related_objects(self):
+        if self._as_of is not None:
+            self._prefetch_related_lookups = tuple(restrict_lookups(
+                self.model, self._prefetch_related_lookups,
+                lambda manager: manager.everything().as_of(self._as_of), to_many_only=True))
+        elif isinstance(self.query, LiveRelatedQuery):
+            self._prefetch_related_lookups = tuple(restrict_lookups(
+                self.model, self._prefetch_related_lookups, lambda manager: manager.all().live_related()))
+        super(LogicalDeleteQuerySet, self)._prefetch_related_objects()
+
+    def cached(self, timeout=300):
+        """
+        Returns a copy of the QuerySet whose results are kept in the cache for
+        ``timeout`` seconds. The cache keys include the generation of every
+        model the query reads, prefetched relations included, so deleting,
+        restoring or deleting completely objects of them through the
+        collectors invalidates the results. Other changes don't, call
+        `logicaldelete.cache.bump_generation` after them.
+        """
+        return self._clone(_cache_timeout=timeout)
+
+    def _fetch_all(self):
+        if self._cache_timeout is not None and self._result_cache is None:
+            cache = get_cache()
+            key = get_queryset_key(self)
+            results = cache.get(key)
+            if results is None:
+                results = list(self._clone(_cache_timeout=None))
+                cache.set(key, results, self._cache_timeout)
+            self._result_cache = results
+            self._prefetch_done = True
+        if self._with_archive and self._result_cache is None:
+            combined = union_queryset(self)
+            combined._fetch_all()
+            self._result_cache = combined._result_cache
+            self._prefetch_done = combined._prefetch_done
+        super(LogicalDeleteQuerySet, self)._fetch_all()
+
+    def iterator(self):
+        if self._with_archive:
+            return union_queryset(self).iterator()
+        return super(LogicalDeleteQuerySet, self).iterator()
+
+    def exists(self):
+        if self._with_archive and self._result_cache is None:
+            return self._clone(_with_archive=False).exists() or archive_queryset(self).exists()
+        return super(LogicalDeleteQuerySet, self).exists()
+
+    def with_count_strategy(self, strategy, **options):
+        """
+        Returns a copy of the QuerySet whose count() uses ``strategy``, see
+        `logicaldelete.counts.get_count`. None restores exact counts.
+        """
+        return self._clone(_count_strategy=(strategy, options) if strategy else None)
+
+    def count(self):
+        if self._with_archive and self._result_cache is None and self.query.can_filter():
+            return self._clone(_with_archive=False).count() + archive_queryset(self).count()
+        if self._count_strategy is not None and self._result_cache is None:
+            strategy, options = self._count_strategy
+            return get_count(self, strategy, **options)
+        return super(LogicalDeleteQuerySet, self).count()
+
+    def _run_collector(self, objs, method, stats=None, locking=None):
+        """
+        Collects ``objs`` with a new `LogicalDeleteCollector` and returns the
+        result of its ``method``. With ``locking``, by default
+        ``LogicalDeleteMeta.locking``, runs aborted by the database are
+        retried, see `run_with_retries`.
+        """
+        options = get_options(self.model)
+        if locking is None:
+            locking = options.locking
+
+        def run():
+            collector = LogicalDeleteCollector(using=objs.db, stats=stats, locking=locking)
+            if method == 'undelete':
+                collector.collect_undelete(objs)
+            else:
+                collector.collect(objs)
+            return getattr(collector, method)()
+
+        retries = options.lock_retries if locking else 0
+        return run_with_retries(run, objs.db, retries, options.lock_retry_delay)
+
+    def _delete_undelete_batches(self, del_query, method, batch_size, sleep=None, start_after=None, progress=None,
+                                 stats=None, locking=None):
+        """
+        Runs ``method`` of a new `LogicalDeleteCollector` for every batch of
+        ``batch_size`` objects of ``del_query``, each batch in its own
+        transaction. ``progress`` is called with the last primary key of every
+        committed batch, pass it back as ``start_after`` to resume.
+        """
+        if sleep is None:
+            sleep = get_options(self.model).delete_batch_sleep
+
+        deleted, rows_count = 0, Counter()
+        for i, pks in enumerate(pk_batches(del_query, batch_size, start_after)):
+            if i and sleep:
+                time.sleep(sleep)
+
+            objs = self.model._base_manager.using(del_query.db).filter(pk__in=pks)
+            batch_deleted, batch_rows_count = self._run_collector(objs, method, stats=stats, locking=locking)
+
+            deleted += batch_deleted
+            rows_count.update(batch_rows_count)
+            if progress is not None:
+                progress(pks[-1])
+
+        return deleted, dict(rows_count)
+
+    def _get_batch_size(self, batch_size):
+        if batch_size is None:
+            options = get_options(self.model)
+            if options.delete_batches:
+                return options.delete_batch_size
+        return batch_size
+
+    def delete(self, batch_size=None, sleep=None, start_after=None, progress=None, stats=None, locking=None):
         """
         Deletes the records in the current QuerySet.
+
+        With ``batch_size``, or ``LogicalDeleteMeta.delete_batches``, the
+        records are deleted in batches, see `_delete_undelete_batches`. Pass a
+        `LogicalDeleteStats` as ``stats`` to measure the delete, and ``locking`` to
+        override ``LogicalDeleteMeta.locking``.
         """
         assert self.query.can_filter(), \
             "Cannot use 'limit' or 'offset' with delete."
@@ -17,7 +341,8 @@ class LogicalDeleteQuerySet(QuerySet):
         if self._fields is not None:
             raise TypeError("Cannot call delete() after .values() or .values_list()")
 
-        del_query = self._clone()
+        # Archived objects are already deleted.
+        del_query = self._clone(_with_archive=False)
 
         # The delete is actually 2 queries - one to find related objects,
         # and one to delete. Make sure that the discovery of related
@@ -29,9 +354,13 @@ class LogicalDeleteQuerySet(QuerySet):
         del_query.query.select_related = False
         del_query.query.clear_ordering(force_empty=True)
 
-        collector = LogicalDeleteCollector(using=del_query.db)
-        collector.collect(del_query)
-        deleted, _rows_count = collector.delete()
+        batch_size = self._get_batch_size(batch_size)
+        if batch_size:
+            deleted, _rows_count = self._delete_undelete_batches(
+                del_query, 'delete', batch_size, sleep=sleep, start_after=start_after, progress=progress,
+                stats=stats, locking=locking)
+        else:
+            deleted, _rows_count = self._run_collector(del_query, 'delete', stats=stats, locking=locking)
 
         # Clear the result cache, in case this QuerySet gets reused.
         self._result_cache = None
@@ -50,7 +379,10 @@ class LogicalDeleteQuerySet(QuerySet):
         if self._fields is not None:
             raise TypeError("Cannot call delete() after .values() or .values_list()")
 
-        del_query = self._clone()
+        # Archived objects, and the ones archived with them, go back to the
+        # live tables first.
+        unarchive(self)
+        del_query = self._clone(_with_archive=False)
 
         # The delete is actually 2 queries - one to find related objects,
         # and one to delete. Make sure that the discovery of related
@@ -62,7 +394,7 @@ class LogicalDeleteQuerySet(QuerySet):
         del_query.query.select_related = False
         del_query.query.clear_ordering(force_empty=True)
 
-        collector = Collector(using=del_query.db)
+        collector = LogicalDeleteCompleteCollector(using=del_query.db)
         collector.collect(del_query)
         deleted, _rows_count = collector.delete()
 
@@ -73,9 +405,14 @@ class LogicalDeleteQuerySet(QuerySet):
     delete_complete.alters_data = True
     delete_complete.queryset_only = True
 
-    def undelete(self):
+    def undelete(self, batch_size=None, sleep=None, start_after=None, progress=None, stats=None, locking=None):
         """
-        Deletes the records in the current QuerySet.
+        Restores the records in the current QuerySet.
+
+        With ``batch_size``, or ``LogicalDeleteMeta.delete_batches``, the
+        records are restored in batches, see `_delete_undelete_batches`. Pass a
+        `LogicalDeleteStats` as ``stats`` to measure the restore, and ``locking``
+        to override ``LogicalDeleteMeta.locking``.
         """
         assert self.query.can_filter(), \
             "Cannot use 'limit' or 'offset' with delete."
@@ -83,7 +420,10 @@ class LogicalDeleteQuerySet(QuerySet):
         if self._fields is not None:
             raise TypeError("Cannot call delete() after .values() or .values_list()")
 
-        del_query = self._clone()
+        # Archived objects, and the ones archived with them, go back to the
+        # live tables first.
+        unarchive(self)
+        del_query = self._clone(_with_archive=False)
 
         # The delete is actually 2 queries - one to find related objects,
         # and one to delete. Make sure that the discovery of related
@@ -95,13 +435,51 @@ class LogicalDeleteQuerySet(QuerySet):
         del_query.query.select_related = False
         del_query.query.clear_ordering(force_empty=True)
 
-        collector = LogicalDeleteCollector(using=del_query.db)
-        collector.collect(del_query)
-        deleted, _rows_count = collector.undelete()
+        batch_size = self._get_batch_size(batch_size)
+        if batch_size:
+            deleted, _rows_count = self._delete_undelete_batches(
+                del_query, 'undelete', batch_size, sleep=sleep, start_after=start_after, progress=progress,
+                stats=stats, locking=locking)
+        else:
+            deleted, _rows_count = self._run_collector(del_query, 'undelete', stats=stats, locking=locking)
 
         # Clear the result cache, in case this QuerySet gets reused.
         self._result_cache = None
         return deleted, _rows_count
 
     undelete.alters_data = True
-    undelete.queryset_only = True
\ No newline at end of file
+    undelete.queryset_only = True
+
+    def __aiter__(self):
+        from logicaldelete.aio import aiterate
+        return aiterate(self)
+
+    def adelete(self, *args, **kwargs):
+        """
+        Async delete(), see `logicaldelete.aio`.
+        """
+        from logicaldelete.aio import run_sync
+        return run_sync(self.delete, *args, **kwargs)
+
+    adelete.alters_data = True
+    adelete.queryset_only = True
+
+    def adelete_complete(self):
+        """
+        Async delete_complete(), see `logicaldelete.aio`.
+        """
+        from logicaldelete.aio import run_sync
+        return run_sync(self.delete_complete)
+
+    adelete_complete.alters_data = True
+    adelete_complete.queryset_only = True
+
+    def aundelete(self, *args, **kwargs):
+        """
+        Async undelete(), see `logicaldelete.aio`.
+        """
+        from logicaldelete.aio import run_sync
+        return run_sync(self.undelete, *args, **kwargs)
+
+    aundelete.alters_data = True
+    aundelete.queryset_only = True
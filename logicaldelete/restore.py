@@ -0,0 +1,146 @@
+# coding=utf-8
+"""
+Restores everything logically deleted in a time window, like after a bad
+deploy, without collecting the relation graphs: one UPDATE per table.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections, router, transaction
+from django.utils.timezone import now
+
+from logicaldelete.archive import move_rows
+from logicaldelete.cache import bump_generation
+from logicaldelete.deletion import get_model_levels, get_options, has_field
+
+
+def get_restore_models(models=None):
+    """
+    Returns the models of ``models``, by default every `LogicalModel`, whose
+    table holds the ``date_removed`` column: multi-table inheritance children
+    are restored with their parents.
+    """
+    from logicaldelete.models import get_logical_models
+
+    if models is None:
+        models = get_logical_models()
+    return [
+        model for model in models
+        if not model._meta.proxy and model._meta.get_field('date_removed').model is model
+    ]
+
+
+def get_restore_levels(models):
+    """
+    Returns ``models`` in lists that can be restored in parallel, referenced
+    models in earlier lists than the models referencing them. Reference
+    cycles are broken arbitrarily.
+    """
+    levels = get_model_levels(models)
+    return [
+        sorted([model for model in models if levels[model] == level], key=lambda model: model._meta.label)
+        for level in range(max(levels.values()) + 1 if levels else 0)
+    ]
+
+
+def get_window_queryset(model, since, until, using):
+    """
+    Returns the objects of ``model``, an archive model too, logically
+    deleted from ``since`` until ``until``, excluded.
+    """
+    return model._base_manager.using(using).filter(date_removed__gte=since, date_removed__lt=until)
+
+
+def count_window(model, since, until, using=None):
+    """
+    Returns the number of objects of ``model`` `restore_window` would restore,
+    archived objects included.
+    """
+    using = using or router.db_for_write(model)
+    count = get_window_queryset(model, since, until, using).count()
+    archive_model = get_options(model).archive_model
+    if archive_model is not None:
+        count += get_window_queryset(archive_model, since, until, using).count()
+    return count
+
+
+def unarchive_window(model, since, until, using=None):
+    """
+    Moves the archived objects of ``model`` deleted from ``since`` until
+    ``until`` back to its table, still deleted. Returns their number.
+    """
+    using = using or router.db_for_write(model)
+    archive_model = get_options(model).archive_model
+    if archive_model is None:
+        return 0
+    with transaction.atomic(using=using):
+        return move_rows(get_window_queryset(archive_model, since, until, using), model)
+
+
+def restore_model(model, since, until, using=None):
+    """
+    Restores the objects of ``model`` deleted from ``since`` until ``until``
+    with a single UPDATE, in its own transaction, after moving back its
+    archived ones. Counters and change feeds are updated, no signals are
+    sent. Returns the number of restored objects.
+    """
+    from logicaldelete.models import LogicalDeleteCounter
+
+    using = using or router.db_for_write(model)
+    values = {'date_removed': None}
+    if has_field(model, 'deletion_batch'):
+        values['deletion_batch'] = None
+
+    with transaction.atomic(using=using):
+        unarchive_window(model, since, until, using=using)
+        queryset = get_window_queryset(model, since, until, using)
+        if get_options(model).change_feed:
+            from logicaldelete.models import LOGICAL_RESTORE, LogicalDeleteEvent
+            LogicalDeleteEvent.objects.add(
+                model, queryset.values_list('pk', flat=True), LOGICAL_RESTORE, timestamp=now(), using=using)
+        restored = queryset.update(**values)
+        if restored and get_options(model).counters:
+            LogicalDeleteCounter.objects.add(model, active=restored, deleted=-restored, using=using)
+        transaction.on_commit(lambda: bump_generation(model), using=using)
+    return restored
+
+
+def restore_window(since, until, models=None, workers=4, dry_run=False, using=None, progress=None):
+    """
+    Restores every object of ``models``, by default every `LogicalModel`,
+    logically deleted from ``since`` until ``until``, excluded, whatever its
+    relations. Returns the number of restored objects per model label, the
+    number of objects to restore with ``dry_run``.
+
+    Tables are restored by `restore_model` on a pool of ``workers`` threads,
+    one on SQLite, each with its own database connection. Archived objects
+    are moved back first, referenced models first, then tables are restored
+    in the opposite order: restoring a parent first would let the triggers
+    of logicaldelete_triggers restore its children without their counters
+    and change feeds. ``progress`` is called with the model and its count
+    once it's done. Every table is restored in its own
+    transaction, a failure leaves the tables restored so far restored.
+    """
+    func = count_window if dry_run else restore_model
+    models = get_restore_models(models)
+    results = {}
+    if any(connections[using or router.db_for_write(model)].vendor == 'sqlite' for model in models):
+        # SQLite has a single writer, concurrent transactions fail to lock.
+        workers = 1
+
+    def run(func, model):
+        try:
+            return model, func(model, since, until, using=using)
+        finally:
+            connections[using or router.db_for_write(model)].close()
+
+    levels = get_restore_levels(models)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if not dry_run:
+            for level in levels:
+                list(executor.map(lambda model: run(unarchive_window, model), level))
+        for level in reversed(levels):
+            for model, count in executor.map(lambda model: run(func, model), level):
+                results[model._meta.label] = count
+                if progress is not None:
+                    progress(model, count)
+    return results
@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Sent once per model by `LogicalDeleteCollector` with the primary keys of
+# the objects whose date_removed changes, before and after the update.
+pre_logical_delete_bulk = Signal(providing_args=['pks', 'date_removed', 'using'])
+post_logical_delete_bulk = Signal(providing_args=['pks', 'date_removed', 'using'])
+pre_logical_undelete_bulk = Signal(providing_args=['pks', 'date_removed', 'using'])
+post_logical_undelete_bulk = Signal(providing_args=['pks', 'date_removed', 'using'])
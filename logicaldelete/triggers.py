@@ -0,0 +1,154 @@
+# coding=utf-8
+from django.db import connections
+from django.db.backends.utils import truncate_name
+from django.db.models.deletion import CASCADE, DO_NOTHING, get_candidate_relations_to_delete
+
+from logicaldelete.deletion import get_options, has_field, has_instance_signals
+from logicaldelete.signals import (
+    post_logical_delete_bulk, post_logical_undelete_bulk, pre_logical_delete_bulk, pre_logical_undelete_bulk,
+)
+
+supported_vendors = ('postgresql', 'sqlite')
+
+DELETE_SQL = (
+    'UPDATE %(child)s SET %(date_removed)s = NEW.%(date_removed)s, %(deletion_batch)s = NEW.%(deletion_batch)s '
+    'WHERE %(fk)s = NEW.%(target)s AND %(date_removed)s IS NULL'
+)
+# Restores the children deleted with the parent.
+RESTORE_SQL = (
+    'UPDATE %(child)s SET %(date_removed)s = NULL, %(deletion_batch)s = NULL '
+    'WHERE %(fk)s = NEW.%(target)s AND (%(deletion_batch)s = OLD.%(deletion_batch)s OR '
+    '(OLD.%(deletion_batch)s IS NULL AND %(date_removed)s = OLD.%(date_removed)s))'
+)
+DELETED_WHEN = 'OLD.%(date_removed)s IS NULL AND NEW.%(date_removed)s IS NOT NULL'
+RESTORED_WHEN = 'OLD.%(date_removed)s IS NOT NULL AND NEW.%(date_removed)s IS NULL'
+
+
+def get_trigger_relations(models):
+    """
+    Returns the CASCADE relations between ``models`` the triggers can
+    handle, from a `LogicalModel` to another.
+    """
+    relations = []
+    for model in models:
+        for related in get_candidate_relations_to_delete(model._meta):
+            if (related.field.remote_field.on_delete is CASCADE and
+                    not related.related_model._meta.proxy and
+                    has_field(related.related_model, 'deletion_batch')):
+                relations.append(related)
+    return relations
+
+
+def get_trigger_names(related, connection):
+    """
+    Returns the names of the triggers cascading ``related``.
+    """
+    name = 'logicaldelete_%s_%s' % (related.related_model._meta.db_table, related.field.column)
+    if connection.vendor == 'sqlite':
+        names = [name + '_del', name + '_und']
+    else:
+        names = [name]
+    return [truncate_name(name, connection.ops.max_name_length()) for name in names]
+
+
+def get_sql_params(related, connection):
+    qn = connection.ops.quote_name
+    child = related.related_model._meta
+    return {
+        'parent': qn(related.model._meta.db_table),
+        'child': qn(child.db_table),
+        'fk': qn(related.field.column),
+        'target': qn(related.field.target_field.column),
+        'date_removed': qn(child.get_field('date_removed').column),
+        'deletion_batch': qn(child.get_field('deletion_batch').column),
+    }
+
+
+def get_create_sql(related, connection):
+    """
+    Returns the statements installing the triggers of ``related``: setting
+    date_removed on a parent row soft deletes its live children with the same
+    date and deletion batch, clearing it restores the children deleted with
+    it. Children cascade to their own children through their triggers.
+    """
+    params = get_sql_params(related, connection)
+    names = get_trigger_names(related, connection)
+
+    if connection.vendor == 'sqlite':
+        template = ('CREATE TRIGGER %(name)s AFTER UPDATE OF %(date_removed)s ON %(parent)s '
+                    'FOR EACH ROW WHEN %(when)s BEGIN %(update)s; END')
+        return [
+            template % dict(params, name=names[0], when=DELETED_WHEN % params, update=DELETE_SQL % params),
+            template % dict(params, name=names[1], when=RESTORED_WHEN % params, update=RESTORE_SQL % params),
+        ]
+
+    params['name'] = names[0]
+    return [
+        'CREATE OR REPLACE FUNCTION %(name)s() RETURNS trigger AS $$ BEGIN '
+        'IF %(deleted)s THEN %(delete)s; ELSIF %(restored)s THEN %(restore)s; END IF; '
+        'RETURN NULL; END; $$ LANGUAGE plpgsql' % dict(
+            params, deleted=DELETED_WHEN % params, delete=DELETE_SQL % params,
+            restored=RESTORED_WHEN % params, restore=RESTORE_SQL % params),
+        'CREATE TRIGGER %(name)s AFTER UPDATE OF %(date_removed)s ON %(parent)s '
+        'FOR EACH ROW EXECUTE PROCEDURE %(name)s()' % params,
+    ]
+
+
+def get_drop_sql(related, connection):
+    """
+    Returns the statements dropping the triggers of ``related``.
+    """
+    params = get_sql_params(related, connection)
+    names = get_trigger_names(related, connection)
+    if connection.vendor == 'sqlite':
+        return ['DROP TRIGGER IF EXISTS %s' % name for name in names]
+    return [
+        'DROP TRIGGER IF EXISTS %s ON %s' % (names[0], params['parent']),
+        'DROP FUNCTION IF EXISTS %s()' % names[0],
+    ]
+
+
+def get_installed_triggers(using):
+    """
+    Returns the names of the logicaldelete triggers of database ``using``.
+    They are read again on every call, so triggers dropped by another
+    process are never trusted.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        query = 'SELECT tgname FROM pg_trigger WHERE tgname LIKE %s'
+    elif connection.vendor == 'sqlite':
+        query = "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s"
+    else:
+        return frozenset()
+    with connection.cursor() as cursor:
+        cursor.execute(query, ['logicaldelete%'])
+        return frozenset(row[0] for row in cursor.fetchall())
+
+
+def is_cascaded_by_triggers(related, using, path=(), installed=None):
+    """
+    Returns whether the triggers of database ``using``, ``installed`` if
+    given, soft delete and restore the objects of ``related`` and everything
+    they cascade to, and nothing needs them to be updated from Python: signal
+    receivers, counters, archiving on delete or change feeds.
+    """
+    model = related.related_model
+    options = get_options(model)
+    if installed is None:
+        installed = get_installed_triggers(using)
+    if (model in path or
+            not set(get_trigger_names(related, connections[using])) <= installed or
+            has_instance_signals(model) or options.counters or options.archive_on_delete or options.change_feed or
+            any(signal.has_listeners(model) for signal in (
+                pre_logical_delete_bulk, post_logical_delete_bulk,
+                pre_logical_undelete_bulk, post_logical_undelete_bulk))):
+        return False
+
+    for sub_related in get_candidate_relations_to_delete(model._meta):
+        on_delete = sub_related.field.remote_field.on_delete
+        if on_delete is DO_NOTHING or sub_related.related_model._meta.auto_created:
+            continue
+        if on_delete is not CASCADE or not is_cascaded_by_triggers(sub_related, using, path + (model,), installed):
+            return False
+    return True
@@ -1,4 +1,4 @@
-from setuptools import setup
+from setuptools import find_packages, setup
 
 setup(
     name="django-logicaldelete",
@@ -8,9 +8,10 @@ setup(
     url="https://github.com/lvelezsantos/django-logicaldelete",
     description="a base model that provides built in logical delete functionality",
     long_description=open("README.rst").read(),
-    packages=[
-        "logicaldelete"
-    ],
+    packages=find_packages(exclude=["tests", "tests.*"]),
+    package_data={
+        "logicaldelete": ["templates/admin/*.html"],
+    },
     license="BSD",
     classifiers=[
         "Development Status :: 5 - Beta",
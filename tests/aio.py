@@ -0,0 +1,16 @@
+# Coroutines of the async API tests, Python 3.6 or newer only.
+import asyncio
+
+from logicaldelete.aio import aiterate
+
+
+async def collect(aiterable):
+    return [obj async for obj in aiterable]
+
+
+async def collect_chunks(queryset, chunk_size):
+    return [obj async for obj in aiterate(queryset, chunk_size=chunk_size)]
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
@@ -0,0 +1,61 @@
+from django.contrib.admin import AdminSite
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import RequestFactory, TestCase
+
+from logicaldelete.actions import undelete_selected
+from logicaldelete.admin import LogicalModelAdmin
+from logicaldelete.models import LOGICAL_RESTORE
+
+from tests.testapp.models import Author
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class LoggingAdmin(LogicalModelAdmin):
+
+    def log_restore(self, request, object, object_repr):
+        return super(LoggingAdmin, self).log_restore(request, object, 'restored %s' % object_repr)
+
+
+class LogActionsTests(TestCase):
+
+    def setUp(self):
+        self.request = RequestFactory().post('/')
+        self.request.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.authors = [Author.objects.create(name='author %d' % i) for i in range(3)]
+
+    def test_bulk_log(self):
+        model_admin = LogicalModelAdmin(Author, AdminSite())
+
+        ContentType.objects.clear_cache()
+        # The content type and one insert.
+        with self.assertNumQueries(2):
+            model_admin.log_restores(self.request, self.authors)
+        model_admin.log_deletions_complete(self.request, self.authors)
+
+        self.assertEqual(LogEntry.objects.filter(action_flag=LOGICAL_RESTORE).count(), 3)
+        self.assertEqual(LogEntry.objects.filter(action_flag=DELETION).count(), 3)
+
+    def test_overridden_log_method(self):
+        LoggingAdmin(Author, AdminSite()).log_restores(self.request, self.authors)
+
+        self.assertEqual(
+            sorted(LogEntry.objects.filter(action_flag=LOGICAL_RESTORE).values_list('object_repr', flat=True)),
+            ['restored Author object'] * 3,
+        )
+
+    def test_undelete_selected(self):
+        model_admin = LogicalModelAdmin(Author, AdminSite())
+        Author.objects.filter(name__in=['author 0', 'author 1']).delete()
+        self.request.POST = {'post': 'yes'}
+
+        with mock.patch.object(model_admin, 'message_user'):
+            self.assertIsNone(undelete_selected(model_admin, self.request, Author.objects.only_deleted()))
+
+        self.assertEqual(Author.objects.count(), 3)
+        self.assertEqual(LogEntry.objects.filter(action_flag=LOGICAL_RESTORE).count(), 2)
@@ -0,0 +1,66 @@
+import sys
+import unittest
+
+from django.test import TransactionTestCase
+
+from tests.testapp.models import Author, Book, Chapter
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+@unittest.skipIf(sys.version_info < (3, 6), 'The async API needs Python 3.6.')
+class AsyncTests(TransactionTestCase):
+
+    available_apps = ['logicaldelete', 'tests.testapp']
+
+    def setUp(self):
+        from tests import aio
+        self.aio = aio
+        self.authors = [Author.objects.create(name='author %d' % i) for i in range(5)]
+        for author in self.authors[:2]:
+            author.delete()
+
+    def test_async_for(self):
+        self.assertEqual(len(self.aio.run(self.aio.collect(Author.objects.all()))), 3)
+        self.assertEqual(len(self.aio.run(self.aio.collect(Author.objects.aeverything()))), 5)
+        self.assertEqual(len(self.aio.run(self.aio.collect(Author.objects.aonly_deleted()))), 2)
+
+    def test_chunks(self):
+        from logicaldelete import aio
+
+        queryset = Author.objects.aeverything().order_by('pk')
+        with mock.patch.object(aio, 'run_sync', wraps=aio.run_sync) as run_sync:
+            authors = self.aio.run(self.aio.collect_chunks(queryset, chunk_size=2))
+
+        self.assertEqual(authors, self.authors)
+        self.assertIsNone(queryset._result_cache)
+        # Three chunks, the empty one and closing the iterator.
+        self.assertEqual(run_sync.call_count, 5)
+
+    def test_prefetch_related(self):
+        for author in self.authors[2:]:
+            Book.objects.create(author=author, title='book')
+
+        authors = self.aio.run(self.aio.collect(Author.objects.prefetch_related('book_set')))
+
+        with self.assertNumQueries(0):
+            self.assertEqual([len(author.book_set.all()) for author in authors], [1, 1, 1])
+
+    def test_adelete_and_aundelete(self):
+        author = self.authors[2]
+        book = Book.objects.create(author=author, title='book')
+        Chapter.objects.create(book=book, number=1)
+
+        deleted, rows_count = self.aio.run(Author.objects.filter(pk=author.pk).adelete())
+        self.assertEqual(rows_count, {'testapp.Author': 1, 'testapp.Book': 1, 'testapp.Chapter': 1})
+
+        self.aio.run(Author.objects.everything().filter(pk=author.pk).aundelete())
+        self.assertEqual(Chapter.objects.filter(book__author=author).count(), 1)
+
+    def test_adelete_complete(self):
+        self.aio.run(Author.objects.only_deleted().adelete_complete())
+
+        self.assertEqual(Author.objects.everything().count(), 3)
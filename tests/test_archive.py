@@ -0,0 +1,107 @@
+from django.test import TestCase
+
+from logicaldelete.archive import archive_all
+from logicaldelete.deletion import get_options
+
+from tests.testapp.models import Box, Item, Shelf, Thing
+
+
+class ArchiveTests(TestCase):
+
+    def setUp(self):
+        self.shelf = Shelf.objects.create(name='shelf')
+        for i in range(3):
+            Item.objects.create(shelf=self.shelf, label='item %d' % i)
+        self.shelf_archive = get_options(Shelf).archive_model
+        self.item_archive = get_options(Item).archive_model
+
+    def test_archive_cascade(self):
+        Shelf.objects.filter(pk=self.shelf.pk).delete()
+
+        moved = archive_all([Shelf, Item])
+
+        self.assertEqual(moved, {'testapp.Shelf': 1, 'testapp.Item': 3})
+        self.assertFalse(Shelf._base_manager.exists())
+        self.assertFalse(Item._base_manager.exists())
+        self.assertEqual(self.item_archive._base_manager.count(), 3)
+        self.assertEqual(Shelf.objects.everything().count(), 1)
+        self.assertEqual(Item.objects.only_deleted().count(), 3)
+
+    def test_select_related(self):
+        Shelf.objects.filter(pk=self.shelf.pk).delete()
+        archive_all([Shelf, Item])
+
+        items = list(Item.objects.everything().select_related('shelf'))
+
+        self.assertEqual(len(items), 3)
+        self.assertEqual(len(Item.objects.only_deleted().select_related('shelf')), 3)
+
+    def test_undelete_archived_cascade(self):
+        Shelf.objects.filter(pk=self.shelf.pk).delete()
+        archive_all([Shelf, Item])
+
+        Shelf.objects.everything().filter(pk=self.shelf.pk).undelete()
+
+        self.assertEqual(Shelf.objects.count(), 1)
+        self.assertEqual(Item.objects.filter(shelf=self.shelf).count(), 3)
+        self.assertFalse(self.shelf_archive._base_manager.exists())
+        self.assertFalse(self.item_archive._base_manager.exists())
+
+    def test_delete_complete_archived_cascade(self):
+        Shelf.objects.filter(pk=self.shelf.pk).delete()
+        archive_all([Shelf, Item])
+
+        Shelf.objects.everything().filter(pk=self.shelf.pk).delete_complete()
+
+        self.assertFalse(Shelf.objects.everything().exists())
+        self.assertFalse(Item.objects.everything().exists())
+
+
+class ArchiveOnDeleteTests(TestCase):
+
+    def setUp(self):
+        self.box = Box.objects.create(name='box')
+        for i in range(3):
+            Thing.objects.create(box=self.box, label='thing %d' % i)
+        self.thing_archive = get_options(Thing).archive_model
+
+    def test_children_archived_on_delete(self):
+        self.box.delete()
+
+        self.assertEqual(self.thing_archive._base_manager.count(), 3)
+        self.assertFalse(Thing._base_manager.exists())
+
+    def test_undelete_live_parent(self):
+        Box.objects.filter(pk=self.box.pk).delete()
+
+        deleted, rows_count = Box.objects.everything().filter(pk=self.box.pk).undelete()
+
+        self.assertEqual(rows_count['testapp.Thing'], 3)
+        self.assertEqual(Thing.objects.filter(box=self.box).count(), 3)
+        self.assertFalse(self.thing_archive._base_manager.exists())
+
+    def test_instance_undelete(self):
+        self.box.delete()
+        box = Box.objects.everything().get(pk=self.box.pk)
+
+        box.undelete()
+
+        self.assertEqual(Thing.objects.filter(box=box).count(), 3)
+        self.assertFalse(self.thing_archive._base_manager.exists())
+
+    def test_delete_complete_live_parent(self):
+        Box.objects.filter(pk=self.box.pk).delete()
+
+        Box.objects.everything().filter(pk=self.box.pk).delete_complete()
+
+        self.assertFalse(Box.objects.everything().exists())
+        self.assertFalse(self.thing_archive._base_manager.exists())
+
+    def test_instance_delete_complete(self):
+        self.box.delete()
+
+        Box.objects.everything().get(pk=self.box.pk).delete_complete()
+
+        self.assertFalse(self.thing_archive._base_manager.exists())
+        self.assertFalse(Thing._base_manager.exists())
+
@@ -0,0 +1,67 @@
+from django.test import TransactionTestCase
+
+from logicaldelete.cache import get_cache, get_generation_key
+
+from tests.testapp.models import Author, Book
+
+
+class CachedQuerySetTests(TransactionTestCase):
+
+    def setUp(self):
+        # Flushes and creates don't bump the generations.
+        get_cache().clear()
+        self.author = Author.objects.create(name='author')
+        for i in range(3):
+            Book.objects.create(author=self.author, title='book %d' % i)
+
+    def test_cached_results(self):
+        self.assertEqual(len(Book.objects.cached(60)), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(Book.objects.cached(60)), 3)
+
+    def test_invalidated_by_delete(self):
+        self.assertEqual(len(Book.objects.cached(60)), 3)
+        Book.objects.filter(title='book 0').delete()
+        self.assertEqual(len(Book.objects.cached(60)), 2)
+
+        Book.objects.everything().filter(title='book 0').undelete()
+        self.assertEqual(len(Book.objects.cached(60)), 3)
+
+    def test_evicted_generation(self):
+        self.assertEqual(len(Author.objects.cached(300)), 1)
+        get_cache().delete(get_generation_key(Author))
+
+        Author.objects.filter(name='author').delete()
+
+        self.assertEqual(len(Author.objects.cached(300)), 0)
+
+    def test_invalidated_by_joined_model(self):
+        # Deleting the books changes the authors through the join only.
+        queryset = Author.objects.filter(book__date_removed__isnull=True).distinct()
+        self.assertEqual(len(queryset.cached(60)), 1)
+
+        Book.objects.filter(author=self.author).delete()
+
+        self.assertEqual(len(queryset.cached(60)), 0)
+
+    def test_invalidated_by_prefetched_model(self):
+        queryset = Author.objects.prefetch_related('book_set')
+        self.assertEqual(len(queryset.cached(60)[0].book_set.all()), 3)
+
+        Book.objects.filter(title='book 0').delete()
+
+        self.assertEqual(len(queryset.cached(60)[0].book_set.all()), 2)
+
+    def test_invalidated_by_subquery_model(self):
+        queryset = Author.objects.filter(pk__in=Book.objects.values('author'))
+        self.assertEqual(len(queryset.cached(60)), 1)
+
+        Book.objects.filter(author=self.author).delete()
+
+        self.assertEqual(len(queryset.cached(60)), 0)
+
+    def test_prefetch_lookups_in_key(self):
+        self.assertEqual(len(Author.objects.cached(60)), 1)
+        author = list(Author.objects.prefetch_related('book_set').cached(60))[0]
+        with self.assertNumQueries(0):
+            self.assertEqual(len(author.book_set.all()), 3)
@@ -0,0 +1,29 @@
+from django.db import connection
+from django.test import SimpleTestCase
+
+from logicaldelete.checks import check_partial_indexes, check_unique_live
+
+from tests.testapp.models import Book
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class ChecksTests(SimpleTestCase):
+
+    def test_partial_indexes(self):
+        self.assertEqual(check_partial_indexes(), [])
+
+    def test_unique_live_with_partial_indexes(self):
+        with mock.patch.object(Book._logicaldelete, 'unique_live', (('author', 'title'),)):
+            self.assertEqual(check_unique_live(), [])
+
+    def test_unique_live_without_partial_indexes(self):
+        with mock.patch.object(Book._logicaldelete, 'unique_live', (('author', 'title'),)):
+            with mock.patch.object(connection, 'vendor', 'mysql'):
+                errors = check_unique_live()
+
+        self.assertEqual([error.id for error in errors], ['logicaldelete.E001'])
+        self.assertIs(errors[0].obj, Book)
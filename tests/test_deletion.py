@@ -0,0 +1,213 @@
+from django.db import OperationalError, connection, transaction
+from django.db.models.signals import post_save
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from logicaldelete.deletion import LogicalDeleteCollector, LogicalDeleteStats
+
+from tests.testapp.models import Author, Book, Chapter
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+def create_author(name='author', books=3, chapters=2):
+    author = Author.objects.create(name=name)
+    for i in range(books):
+        book = Book.objects.create(author=author, title='book %d' % i)
+        for number in range(chapters):
+            Chapter.objects.create(book=book, number=number)
+    return author
+
+
+class SetBasedCascadeTests(TestCase):
+
+    def test_cascade_counts(self):
+        author = create_author()
+        create_author(name='other')
+
+        deleted, rows_count = Author.objects.filter(pk=author.pk).delete()
+
+        self.assertEqual(deleted, 10)
+        self.assertEqual(rows_count['testapp.Author'], 1)
+        self.assertEqual(rows_count['testapp.Book'], 3)
+        self.assertEqual(rows_count['testapp.Chapter'], 6)
+        self.assertEqual(Author.objects.count(), 1)
+        self.assertEqual(Book.objects.count(), 3)
+        self.assertEqual(Chapter.objects.count(), 6)
+        self.assertEqual(Chapter.objects.only_deleted().filter(book__author=author).count(), 6)
+
+    def test_cascade_skips_deleted_objects(self):
+        author = create_author()
+        Book.objects.filter(author=author).first().delete()
+
+        deleted, rows_count = Author.objects.filter(pk=author.pk).delete()
+
+        self.assertEqual(rows_count['testapp.Book'], 2)
+        self.assertEqual(rows_count['testapp.Chapter'], 4)
+
+    def test_counters(self):
+        author = create_author()
+        Author.objects.filter(pk=author.pk).delete()
+        self.assertEqual(Book.objects.counts(), {'active': 0, 'deleted': 3})
+
+        Author.objects.everything().filter(pk=author.pk).undelete()
+        self.assertEqual(Book.objects.counts(), {'active': 3, 'deleted': 0})
+
+    def test_counters_receiver_per_model(self):
+        self.assertTrue(post_save.has_listeners(Book))
+        self.assertFalse(post_save.has_listeners(Author))
+        self.assertFalse(post_save.has_listeners(Chapter))
+
+
+class SetUpdatesSQLTests(TestCase):
+
+    def get_set_updates_sql(self, queryset):
+        collector = LogicalDeleteCollector(using='default')
+        collector.collect(queryset)
+        return collector.get_set_updates_sql(now())
+
+    def test_statement(self):
+        models, statement, params = self.get_set_updates_sql(Author.objects.filter(name='author'))
+
+        self.assertEqual(models, [Chapter, Book, Author])
+        self.assertTrue(statement.startswith('WITH u0 AS (UPDATE "testapp_chapter" SET'))
+        self.assertTrue(statement.endswith('SELECT (SELECT COUNT(*) FROM u0), (SELECT COUNT(*) FROM u1), '
+                                           '(SELECT COUNT(*) FROM u2)'))
+        self.assertEqual(statement.count('RETURNING 1'), 3)
+        self.assertEqual(len(params), 6)
+
+    def test_joins_are_not_nested(self):
+        models, statement, params = self.get_set_updates_sql(Author.objects.filter(book__title='book 0'))
+
+        author_update = statement[statement.index('u2 AS'):]
+        self.assertEqual(author_update.count('INNER JOIN "testapp_book"'), 1)
+        self.assertEqual(author_update.count('IN (SELECT'), 1)
+
+
+class DeletionBatchTests(TestCase):
+
+    def test_undelete_restores_only_the_batch(self):
+        author = create_author()
+        book = Book.objects.filter(author=author).first()
+        book.delete()
+        Author.objects.filter(pk=author.pk).delete()
+
+        Author.objects.everything().filter(pk=author.pk).undelete()
+
+        self.assertEqual(Book.objects.filter(author=author).count(), 2)
+        self.assertEqual(Chapter.objects.filter(book__author=author).count(), 4)
+        self.assertFalse(Book.objects.everything().get(pk=book.pk).active())
+
+    def test_deletion_batch_is_shared_by_the_cascade(self):
+        author = create_author()
+        Author.objects.filter(pk=author.pk).delete()
+
+        batches = set(Chapter.objects.everything().values_list('deletion_batch', flat=True))
+        batches.update(Book.objects.everything().values_list('deletion_batch', flat=True))
+        self.assertEqual(batches, {Author.objects.everything().get(pk=author.pk).deletion_batch})
+
+
+class LockingTests(TransactionTestCase):
+
+    def delete_with_failures(self, failures, **kwargs):
+        author = create_author()
+        lock_rows = LogicalDeleteCollector.lock_rows
+        calls = []
+
+        def flaky_lock_rows(collector):
+            calls.append(collector)
+            if len(calls) <= failures:
+                raise OperationalError('deadlock detected')
+            return lock_rows(collector)
+
+        with mock.patch.object(LogicalDeleteCollector, 'lock_rows', flaky_lock_rows):
+            with mock.patch('time.sleep'):
+                result = Author.objects.filter(pk=author.pk).delete(locking='wait', **kwargs)
+        return result, calls
+
+    def test_retry(self):
+        (deleted, rows_count), calls = self.delete_with_failures(2)
+
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(deleted, 10)
+        self.assertEqual(Chapter.objects.count(), 0)
+
+    def test_retries_exhausted(self):
+        with self.assertRaises(OperationalError):
+            self.delete_with_failures(4)
+        self.assertEqual(Chapter.objects.count(), 6)
+
+    def test_no_retry_in_transaction(self):
+        with self.assertRaises(OperationalError):
+            with transaction.atomic():
+                self.delete_with_failures(1)
+
+    def test_lock_order(self):
+        author = create_author()
+        collector = LogicalDeleteCollector(using='default', locking='wait')
+        collector.collect(Author.objects.filter(pk=author.pk))
+        collector.lock_rows()
+
+        labels = [model._meta.label for model in collector.pk_updates]
+        self.assertEqual(labels, sorted(labels))
+        for pks in collector.pk_updates.values():
+            self.assertEqual(list(pks), sorted(pks))
+        self.assertEqual(len(collector.pk_updates[Chapter]), 6)
+
+
+    def test_skip_locked_drops_the_cascade(self):
+        author = create_author()
+        other = create_author(name='other')
+        locked_book = Book.objects.filter(author=author).first()
+        lock_pks = LogicalDeleteCollector.lock_pks
+
+        def skip_book(collector, model, pks):
+            # Another worker holds the lock of one book.
+            return [pk for pk in lock_pks(collector, model, pks) if model is not Book or pk != locked_book.pk]
+
+        with mock.patch.object(LogicalDeleteCollector, 'lock_pks', skip_book):
+            deleted, rows_count = Author.objects.filter(pk__in=[author.pk, other.pk]).delete(locking='skip_locked')
+
+        self.assertEqual(rows_count, {'testapp.Author': 1, 'testapp.Book': 3, 'testapp.Chapter': 6})
+        self.assertEqual(list(Author.objects.all()), [author])
+        self.assertEqual(Book.objects.filter(author=author).count(), 3)
+        self.assertEqual(Chapter.objects.filter(book__author=author).count(), 6)
+
+
+class StatsTests(TestCase):
+
+    def test_queries(self):
+        author = create_author()
+        stats = LogicalDeleteStats()
+        with CaptureQueriesContext(connection) as queries:
+            Author.objects.filter(pk=author.pk).delete(stats=stats)
+
+        self.assertEqual(stats.queries, len(queries))
+        self.assertEqual(set(stats.timings), {'collect', 'signals', 'updates', 'field_updates', 'archive'})
+
+    def test_queries_log_untouched(self):
+        author = create_author()
+        stats = LogicalDeleteStats()
+        queries_log = len(connection.queries_log)
+
+        author.delete(stats=stats)
+
+        self.assertGreater(stats.queries, 0)
+        self.assertEqual(len(connection.queries_log), queries_log)
+        self.assertFalse(connection.force_debug_cursor)
+
+    def test_full_queries_log(self):
+        author = create_author()
+        self.addCleanup(connection.queries_log.clear)
+        with CaptureQueriesContext(connection):
+            with connection.cursor() as cursor:
+                for _ in range(connection.queries_log.maxlen + 100):
+                    cursor.execute('SELECT 1')
+            stats = LogicalDeleteStats()
+            author.delete(stats=stats)
+
+        self.assertGreater(stats.queries, 0)
@@ -0,0 +1,64 @@
+import datetime
+
+from django.test import TestCase
+from django.utils.timezone import now
+
+from logicaldelete.models import LOGICAL_DELETION, LOGICAL_RESTORE, LogicalDeleteEvent
+
+from tests.test_deletion import create_author
+from tests.testapp.models import Author, Book, Chapter
+
+
+class FeedTests(TestCase):
+
+    def setUp(self):
+        for model in (Book, Chapter):
+            model._logicaldelete.change_feed = True
+            self.addCleanup(setattr, model._logicaldelete, 'change_feed', False)
+        self.author = create_author(books=2, chapters=1)
+        Author.objects.filter(pk=self.author.pk).delete()
+        Author.objects.everything().filter(pk=self.author.pk).undelete()
+
+    def test_read(self):
+        events = LogicalDeleteEvent.objects.read(limit=3)
+        self.assertEqual(len(events), 3)
+        self.assertEqual([event.operation for event in events], [LOGICAL_DELETION] * 3)
+
+        rest = LogicalDeleteEvent.objects.read(after=events[-1].pk)
+        self.assertEqual(len(rest), 5)
+        self.assertTrue(all(event.pk > events[-1].pk for event in rest))
+        self.assertEqual([event.operation for event in rest], [LOGICAL_DELETION] + [LOGICAL_RESTORE] * 4)
+
+        self.assertEqual(LogicalDeleteEvent.objects.read(after=rest[-1].pk), [])
+
+    def test_models(self):
+        events = LogicalDeleteEvent.objects.read(models=[Book])
+
+        self.assertEqual([event.model for event in events], ['testapp.Book'] * 4)
+        self.assertEqual(
+            sorted(event.object_pk for event in events if event.operation == LOGICAL_DELETION),
+            sorted(str(pk) for pk in Book.objects.filter(author=self.author).values_list('pk', flat=True)),
+        )
+
+    def test_lag(self):
+        self.assertEqual(LogicalDeleteEvent.objects.read(lag=60), [])
+
+        LogicalDeleteEvent.objects.update(timestamp=now() - datetime.timedelta(minutes=2))
+        self.assertEqual(len(LogicalDeleteEvent.objects.read(lag=60)), 8)
+
+    def test_pages(self):
+        pages = list(LogicalDeleteEvent.objects.pages(page_size=3))
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        self.assertEqual(
+            [event.pk for page in pages for event in page],
+            list(LogicalDeleteEvent.objects.order_by('pk').values_list('pk', flat=True)),
+        )
+
+        resumed = list(LogicalDeleteEvent.objects.pages(after=pages[0][-1].pk, page_size=3, models=[Chapter]))
+        self.assertTrue(resumed)
+        self.assertEqual(
+            [event.pk for page in resumed for event in page],
+            list(LogicalDeleteEvent.objects.filter(pk__gt=pages[0][-1].pk, model='testapp.Chapter')
+                 .order_by('pk').values_list('pk', flat=True)),
+        )
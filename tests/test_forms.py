@@ -0,0 +1,67 @@
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from logicaldelete.forms import LogicalModelForm
+
+from tests.testapp.models import Member
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class MemberForm(LogicalModelForm):
+
+    class Meta:
+        model = Member
+        fields = ['team', 'email', 'nick']
+
+
+class LogicalModelFormTests(TestCase):
+
+    def setUp(self):
+        Member.objects.create(team='a', email='deleted@example.com', nick='deleted').delete()
+        Member.objects.create(team='a', email='live@example.com', nick='live')
+
+    def test_no_collision(self):
+        form = MemberForm({'team': 'a', 'email': 'new@example.com', 'nick': 'new'})
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_single_query(self):
+        form = MemberForm({'team': 'a', 'email': 'new@example.com', 'nick': 'new'})
+        with CaptureQueriesContext(connection) as queries:
+            form.is_valid()
+
+        deleted_queries = [query for query in queries if 'IS NOT NULL' in query['sql']]
+        self.assertEqual(len(deleted_queries), 1)
+
+    def test_reported_constraint(self):
+        form = MemberForm({'team': 'a', 'email': 'deleted@example.com', 'nick': 'new'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('team, email', form.non_field_errors()[0])
+
+        form = MemberForm({'team': 'a', 'email': 'new@example.com', 'nick': 'deleted'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('team, nick', form.non_field_errors()[0])
+
+    def test_edit_the_deleted_object(self):
+        member = Member.objects.only_deleted().get()
+        form = MemberForm({'team': 'a', 'email': 'deleted@example.com', 'nick': 'deleted'}, instance=member)
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_unattributed_collision(self):
+        # Like a case insensitive collation matching values Python doesn't.
+        form = MemberForm({'team': 'a', 'email': 'new@example.com', 'nick': 'new'})
+        with mock.patch.object(QuerySet, 'values', return_value=[
+                {'team': 'A', 'email': 'NEW@example.com', 'nick': 'NEW'}]):
+            self.assertFalse(form.is_valid())
+
+        self.assertIn('team, email; team, nick', form.non_field_errors()[0])
+
+    def test_validate_deleted_unique_disabled(self):
+        form = MemberForm({'team': 'a', 'email': 'deleted@example.com', 'nick': 'deleted'})
+        form.validate_deleted_unique = False
+        self.assertTrue(form.is_valid(), form.errors)
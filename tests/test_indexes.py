@@ -0,0 +1,32 @@
+from django.db import connection
+from django.test import TestCase
+
+from logicaldelete.indexes import ActiveIndex, DeletedIndex, DeletionBatchIndex
+
+from tests.testapp.models import Book
+
+
+class PartialIndexTests(TestCase):
+
+    def test_active_index_covers_the_primary_key(self):
+        indexes = [index for index in Book._meta.indexes if isinstance(index, ActiveIndex)]
+        self.assertEqual([index.fields for index in indexes], [['id']])
+
+        with connection.schema_editor() as editor:
+            sql = indexes[0].create_sql(Book, editor)
+        self.assertIn('("id")', sql)
+        self.assertTrue(sql.endswith('WHERE "date_removed" IS NULL'))
+
+    def test_deleted_index_covers_date_removed(self):
+        indexes = [index for index in Book._meta.indexes if isinstance(index, DeletedIndex)]
+        self.assertEqual([index.fields for index in indexes], [['date_removed']])
+
+    def test_deletion_batch_index_leaves_live_rows_out(self):
+        self.assertFalse(Book._meta.get_field('deletion_batch').db_index)
+        indexes = [index for index in Book._meta.indexes if isinstance(index, DeletionBatchIndex)]
+        self.assertEqual([index.fields for index in indexes], [['deletion_batch']])
+
+        with connection.schema_editor() as editor:
+            sql = indexes[0].create_sql(Book, editor)
+        self.assertIn('("deletion_batch")', sql)
+        self.assertTrue(sql.endswith('WHERE "deletion_batch" IS NOT NULL'))
@@ -0,0 +1,74 @@
+import datetime
+
+from django.test import TestCase
+from django.utils.timezone import now
+
+from logicaldelete.archive import archive_all
+from logicaldelete.deletion import get_options
+from logicaldelete.purge import purge, purge_all
+
+from tests.test_deletion import create_author
+from tests.testapp.models import Author, Book, Chapter, Item, Shelf
+
+
+class PurgeTests(TestCase):
+
+    def setUp(self):
+        self.authors = [create_author(name='author %d' % i, books=1, chapters=1) for i in range(5)]
+        self.live = create_author(name='live', books=1, chapters=1)
+        Author.objects.exclude(pk=self.live.pk).delete()
+        self.older_than = now() + datetime.timedelta(seconds=1)
+
+    def test_chunks(self):
+        progress = []
+        deleted, rows_count = purge(Author, older_than=self.older_than, chunk_size=2,
+                                    progress=lambda model, pk, deleted: progress.append((pk, deleted)))
+
+        self.assertEqual(deleted, 15)
+        self.assertEqual(rows_count, {'testapp.Author': 5, 'testapp.Book': 5, 'testapp.Chapter': 5})
+        self.assertEqual(progress, [(self.authors[1].pk, 6), (self.authors[3].pk, 12), (self.authors[4].pk, 15)])
+        self.assertEqual(list(Author.objects.everything()), [self.live])
+        self.assertEqual(Chapter.objects.everything().count(), 1)
+
+    def test_resume(self):
+        deleted, rows_count = purge(Author, older_than=self.older_than, chunk_size=2,
+                                    start_after=self.authors[1].pk)
+
+        self.assertEqual(rows_count['testapp.Author'], 3)
+        self.assertEqual(
+            set(Author.objects.everything().values_list('pk', flat=True)),
+            set([self.authors[0].pk, self.authors[1].pk, self.live.pk]),
+        )
+
+    def test_counters(self):
+        purge(Author, older_than=self.older_than)
+
+        self.assertEqual(Book.objects.counts(), {'active': 1, 'deleted': 0})
+
+    def test_retention(self):
+        self.assertEqual(purge(Author), (0, {}))
+
+        options = get_options(Author)
+        options.retention = datetime.timedelta(days=1)
+        self.addCleanup(setattr, options, 'retention', None)
+        self.assertEqual(purge_all([Author]), {'testapp.Author': (0, {})})
+
+        Author.objects.only_deleted().update(date_removed=now() - datetime.timedelta(days=2))
+        deleted, rows_count = purge_all([Author])['testapp.Author']
+        self.assertEqual(rows_count['testapp.Author'], 5)
+
+    def test_archive(self):
+        shelf = Shelf.objects.create(name='shelf')
+        for i in range(3):
+            Item.objects.create(shelf=shelf, label='item %d' % i)
+        Shelf.objects.filter(pk=shelf.pk).delete()
+        archive_all([Shelf, Item])
+
+        results = purge_all([Item, Shelf], older_than=now() + datetime.timedelta(seconds=1), chunk_size=2)
+
+        self.assertEqual(results, {
+            'testapp.Item': (3, {'testapp.ItemArchive': 3}),
+            'testapp.Shelf': (1, {'testapp.ShelfArchive': 1}),
+        })
+        self.assertEqual(Item.objects.everything().count(), 0)
+        self.assertEqual(get_options(Shelf).archive_model._base_manager.count(), 0)
@@ -0,0 +1,90 @@
+import datetime
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.utils.six import StringIO
+from django.utils.timezone import now
+
+from logicaldelete.archive import archive_all
+from logicaldelete.models import LOGICAL_RESTORE, LogicalDeleteEvent
+from logicaldelete.restore import restore_window
+
+from tests.test_deletion import create_author
+from tests.testapp.models import Author, Book, Chapter, Item, Shelf
+
+MODELS = [Author, Book, Chapter]
+
+
+class RestoreWindowTests(TransactionTestCase):
+
+    available_apps = ['logicaldelete', 'tests.testapp']
+
+    def setUp(self):
+        self.author = create_author()
+        self.other = create_author(name='other')
+        Author.objects.filter(pk=self.other.pk).delete()
+        for model in MODELS:
+            model.objects.only_deleted().update(date_removed=now() - datetime.timedelta(hours=1))
+        self.since = now()
+        Author.objects.filter(pk=self.author.pk).delete()
+        self.until = now() + datetime.timedelta(seconds=1)
+
+    def test_restore_window(self):
+        results = restore_window(self.since, self.until, models=MODELS)
+
+        self.assertEqual(results, {'testapp.Author': 1, 'testapp.Book': 3, 'testapp.Chapter': 6})
+        self.assertEqual(Chapter.objects.filter(book__author=self.author).count(), 6)
+        self.assertFalse(Author.objects.get(pk=self.other.pk).active())
+        self.assertEqual(Book.objects.counts(), {'active': 3, 'deleted': 3})
+
+    def test_dry_run(self):
+        results = restore_window(self.since, self.until, models=MODELS, dry_run=True)
+
+        self.assertEqual(results, {'testapp.Author': 1, 'testapp.Book': 3, 'testapp.Chapter': 6})
+        self.assertFalse(Author.objects.exists())
+
+    def test_restore_with_triggers(self):
+        call_command('logicaldelete_triggers', 'testapp.Author', 'testapp.Book', stdout=StringIO())
+        self.addCleanup(call_command, 'logicaldelete_triggers', '--drop', stdout=StringIO())
+
+        results = restore_window(self.since, self.until, models=MODELS)
+
+        self.assertEqual(results, {'testapp.Author': 1, 'testapp.Book': 3, 'testapp.Chapter': 6})
+        self.assertEqual(Book.objects.counts(), {'active': 3, 'deleted': 3})
+
+    def test_change_feed(self):
+        Book._logicaldelete.change_feed = True
+        self.addCleanup(setattr, Book._logicaldelete, 'change_feed', False)
+
+        restore_window(self.since, self.until, models=MODELS)
+
+        self.assertEqual(
+            sorted(LogicalDeleteEvent.objects.filter(operation=LOGICAL_RESTORE).values_list('object_pk', flat=True)),
+            sorted(str(pk) for pk in Book.objects.filter(author=self.author).values_list('pk', flat=True)),
+        )
+
+    def test_archived_cascade(self):
+        shelf = Shelf.objects.create(name='shelf')
+        for i in range(3):
+            Item.objects.create(shelf=shelf, label='item %d' % i)
+        Shelf.objects.filter(pk=shelf.pk).delete()
+        archive_all([Shelf, Item])
+
+        results = restore_window(now() - datetime.timedelta(seconds=1), now() + datetime.timedelta(seconds=1),
+                                 models=[Shelf, Item])
+
+        self.assertEqual(results, {'testapp.Shelf': 1, 'testapp.Item': 3})
+        self.assertEqual(Item.objects.filter(shelf=shelf).count(), 3)
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            'logicaldelete_restore', 'testapp.Author', 'testapp.Book', 'testapp.Chapter',
+            '--since=%s' % self.since.isoformat(), '--until=%s' % self.until.isoformat(), stdout=out,
+        )
+
+        self.assertEqual(out.getvalue().splitlines(), [
+            'testapp.Author: 1 objects restored',
+            'testapp.Book: 3 objects restored',
+            'testapp.Chapter: 6 objects restored',
+        ])
@@ -0,0 +1,76 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from logicaldelete.triggers import get_installed_triggers, get_trigger_names, get_trigger_relations
+
+from tests.test_deletion import create_author
+from tests.testapp.models import Author, Book, Chapter
+
+
+def call_triggers(*args):
+    out = StringIO()
+    call_command('logicaldelete_triggers', *args, stdout=out)
+    return out.getvalue()
+
+
+class TriggerCommandTests(TestCase):
+
+    def get_names(self, *models):
+        return set(
+            name for related in get_trigger_relations(models)
+            for name in get_trigger_names(related, connection)
+        )
+
+    def test_install_and_drop(self):
+        names = self.get_names(Author, Book)
+
+        self.assertEqual(call_triggers('testapp.Author', 'testapp.Book'), 'Installed the triggers of 2 relations.\n')
+        self.assertEqual(len(names), 4)
+        self.assertTrue(names <= get_installed_triggers('default'))
+
+        self.assertEqual(call_triggers('testapp.Author', '--drop'), 'Dropped the triggers of 1 relations.\n')
+        self.assertEqual(get_installed_triggers('default') & names, self.get_names(Book))
+
+    def test_sql(self):
+        output = call_triggers('testapp.Book', '--sql')
+
+        self.assertIn('CREATE TRIGGER', output)
+        self.assertFalse(get_installed_triggers('default'))
+
+
+class TriggerCascadeTests(TestCase):
+
+    def setUp(self):
+        call_triggers('testapp.Author', 'testapp.Book')
+        self.author = create_author()
+
+    def test_set_based_cascade(self):
+        Author.objects.filter(pk=self.author.pk).delete()
+
+        self.assertEqual(Chapter.objects.count(), 0)
+        self.assertEqual(Chapter.objects.only_deleted().count(), 6)
+        self.assertEqual(Book.objects.counts(), {'active': 0, 'deleted': 3})
+
+    def test_pk_cascade_updates_children_first(self):
+        # Deletes leave the chapters to the triggers, books have counters.
+        deleted, rows_count = Author.objects.filter(pk=self.author.pk).delete(locking='wait')
+
+        self.assertEqual(rows_count, {'testapp.Author': 1, 'testapp.Book': 3})
+        self.assertEqual(Book.objects.counts(), {'active': 0, 'deleted': 3})
+        self.assertEqual(Chapter.objects.count(), 0)
+
+        deleted, rows_count = Author.objects.everything().filter(pk=self.author.pk).undelete(locking='wait')
+
+        self.assertEqual(rows_count, {'testapp.Author': 1, 'testapp.Book': 3, 'testapp.Chapter': 6})
+        self.assertEqual(Book.objects.counts(), {'active': 3, 'deleted': 0})
+        self.assertEqual(Chapter.objects.count(), 6)
+
+    def test_dropped_triggers(self):
+        Author.objects.filter(pk=create_author(name='other').pk).delete()
+        call_triggers('--drop')
+
+        Author.objects.filter(pk=self.author.pk).delete()
+
+        self.assertEqual(Chapter.objects.count(), 0)
@@ -0,0 +1,56 @@
+from django.db import models
+
+from logicaldelete.models import LogicalModel
+
+
+class Author(LogicalModel):
+    name = models.CharField(max_length=50)
+
+
+class Book(LogicalModel):
+    author = models.ForeignKey(Author, on_delete=models.CASCADE)
+    title = models.CharField(max_length=50)
+
+    class LogicalDeleteMeta:
+        counters = True
+
+
+class Chapter(LogicalModel):
+    book = models.ForeignKey(Book, on_delete=models.CASCADE)
+    number = models.IntegerField()
+
+
+class Shelf(LogicalModel):
+    name = models.CharField(max_length=20)
+
+    class LogicalDeleteMeta:
+        archive = True
+
+
+class Item(LogicalModel):
+    shelf = models.ForeignKey(Shelf, on_delete=models.CASCADE)
+    label = models.CharField(max_length=20)
+
+    class LogicalDeleteMeta:
+        archive = True
+
+
+class Box(LogicalModel):
+    name = models.CharField(max_length=20)
+
+
+class Thing(LogicalModel):
+    box = models.ForeignKey(Box, on_delete=models.CASCADE)
+    label = models.CharField(max_length=20)
+
+    class LogicalDeleteMeta:
+        archive_on_delete = True
+
+
+class Member(LogicalModel):
+    team = models.CharField(max_length=20)
+    email = models.CharField(max_length=50)
+    nick = models.CharField(max_length=20)
+
+    class Meta:
+        unique_together = [('team', 'email'), ('team', 'nick')]